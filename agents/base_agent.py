@@ -1,13 +1,38 @@
 import os
 import json
-import openai
-import anthropic
-import requests
+import time
+import asyncio
 from abc import ABC, abstractmethod
+from agents.provider_clients import provider_clients
+from agents.prompt_assembler import PromptAssembler, MAX_OUTPUT_TOKENS, estimate_tokens
+from agents.rate_limiter import rate_limiters, RateLimitTimeout
+from agents.response_cache import normalize_query
+from agents.single_flight import in_flight_queries, CallAbandoned
+from agents.routing import provider_router
+from agents.resilience import provider_health, hedge_budget, backoff_delay, RETRY_ATTEMPTS
+
+# Model used with each LLM provider
+PROVIDER_MODELS = {
+    "openai": "gpt-4",
+    "anthropic": "claude-2",
+    "groq": "llama2-70b-4096",
+    "google": "gemini-pro",
+    "cohere": "command-light",
+    "emergenceai": "emergence-7b"
+}
+
+# Returned in place of an answer when a provider call fails
+ERROR_RESPONSE = "I apologize, but I encountered an error when generating a response. Please try again."
 
 class BaseAgent(ABC):
     """Base class for all AI agents in the IPMDAR system."""
     
+    # Knowledge base keys holding the index for each retrieval backend
+    RETRIEVAL_INDEXES = {
+        "bm25": "_bm25",
+        "vector": "_index"
+    }
+    
     def __init__(self, knowledge_base, name="Base Agent", expertise="IPMDAR"):
         self.knowledge_base = knowledge_base
         self.name = name
@@ -23,48 +48,205 @@ class BaseAgent(ABC):
         
         # Set default LLM provider
         self.llm_provider = "openai"  # Can be: openai, anthropic, groq, google, cohere, emergenceai
+        
+        # Retrieval settings: backend is "bm25" (keyword ranking) or "vector" (hashed TF-IDF embeddings)
+        self.retrieval_backend = os.getenv("IPMDAR_RETRIEVAL_BACKEND", "bm25")
+        self.retrieval_top_k = 20
+        
+        # Sentences an agent may add from other categories that match its domain keywords
+        self.cross_category_top_k = 5
+        
+        # Optional ResponseCache shared by the agents; set by the application
+        self.response_cache = None
+        
+        # Providers the router may send this agent's calls to; None allows every provider with an API key
+        self.allowed_providers = None
+        
+        # Optional secondary provider for hedged requests; None disables hedging for this agent
+        self.hedge_provider = None
+        
+        # Seconds a query may spend across provider retries and failover
+        self.latency_budget_seconds = float(os.getenv("IPMDAR_REQUEST_BUDGET_SECONDS", "40"))
+        
+        # Coroutine API over the same agent; see AsyncBaseAgent
+        self.async_agent = AsyncBaseAgent(self)
+    
+    def _cache_scope(self):
+        """Return the (agent, provider, model, knowledge version) a cached response is valid for."""
+        return (self.name, self.llm_provider, PROVIDER_MODELS.get(self.llm_provider), self.knowledge_base.get("_version"))
+    
+    def _cached_response(self, query):
+        if self.response_cache is None:
+            return None
+        return self.response_cache.get(*self._cache_scope(), query)
+    
+    def _cache_response(self, query, result):
+        # Never cache a failed provider call, so the next request retries it
+        if self.response_cache is None or ERROR_RESPONSE in result["response"]:
+            return
+        # Entries are scoped to the home provider and its model, so an answer that came from failover,
+        # adaptive routing or a hedge is not cached as if the home provider had given it
+        if result.get("provider") != self.llm_provider:
+            return
+        self.response_cache.set(*self._cache_scope(), query, result)
+    
+    def _flight_key(self, query):
+        """Key under which identical concurrent queries to this agent share one in-flight call."""
+        return (*self._cache_scope(), normalize_query(query))
     
     def process_query(self, query):
         """Process a user query and return a response with accuracy rating."""
+        cached = self._cached_response(query)
+        if cached is not None:
+            return dict(cached)
+        
+        # Identical queries already in flight wait for that call instead of making their own;
+        # each caller gets its own copy of the result
+        return dict(in_flight_queries.run(self._flight_key(query), lambda: self._process_query(query)))
+    
+    def _process_query(self, query):
         # Retrieve relevant knowledge
         relevant_knowledge = self.retrieve_relevant_knowledge(query)
         
-        # Generate response
-        response = self.generate_response(query, relevant_knowledge)
+        # Generate response, failing over to the next healthy provider if this agent's is down
+        answer, prompt_budget, provider, hedge = provider_clients.run(self.async_agent.answer(query, relevant_knowledge))
+        response = answer + self.response_suffix(query)
         
         # Verify accuracy
         accuracy = self.verify_accuracy(query, response, relevant_knowledge)
         
-        return {
+        result = {
             "agent": self.name,
             "response": response,
-            "accuracy": accuracy
+            "accuracy": accuracy,
+            "provider": provider,
+            "hedge": hedge,
+            "prompt_budget": prompt_budget
         }
+        self._cache_response(query, result)
+        return result
     
     def retrieve_relevant_knowledge(self, query):
         """Retrieve knowledge relevant to the query."""
-        # In a production system, this would use proper vector embeddings and semantic search
+        categories = ["general"]
+        if hasattr(self, 'knowledge_category'):
+            categories.insert(0, self.knowledge_category)
+
+        # Rank sentences from this agent's categories against the query with the selected backend
+        index = self.knowledge_base.get(self.RETRIEVAL_INDEXES.get(self.retrieval_backend, "_bm25"))
+        if index is not None:
+            relevant_sections = index.top_sentences(query, self.retrieval_top_k, categories)
+            if relevant_sections:
+                return relevant_sections
+
+        # Nothing matched the query terms, so fall back to the head of the agent's own category
         relevant_sections = []
+        for category in categories:
+            if category in self.knowledge_base:
+                relevant_sections.extend(self.knowledge_base[category][:self.retrieval_top_k - len(relevant_sections)])
+        return relevant_sections
+    
+    def related_knowledge(self, query, keywords, categories, exclude=()):
+        """
+        Return the sentences from other categories that best match a query among those containing the keywords.
         
-        # Get knowledge sections relevant to this agent's expertise
-        if hasattr(self, 'knowledge_category'):
-            if self.knowledge_category in self.knowledge_base:
-                relevant_sections.extend(self.knowledge_base[self.knowledge_category])
+        Keyword matches come from the knowledge base's keyword postings and are
+        ranked by their BM25 score for the query over those categories; at most
+        cross_category_top_k are returned, leaving out any sentence in exclude.
+        """
+        postings = self.knowledge_base.get("_keywords")
+        if postings is None:
+            return []
+        matches = postings.lookup(keywords, categories)
         
-        # Add some general knowledge
-        if "general" in self.knowledge_base:
-            relevant_sections.extend(self.knowledge_base["general"][:50])  # Limit to first 50 general items
-            
-        return relevant_sections
+        index = self.knowledge_base.get("_bm25")
+        if index is not None:
+            scores = {}
+            for doc_id, score in index.search(query, len(index), categories):
+                scores.setdefault(index.sentences[doc_id], score)
+            # Stable sort, so matches that share a score (or have none) keep knowledge base order
+            matches = sorted(matches, key=lambda sentence: -scores.get(sentence, 0.0))
+        
+        excluded = set(exclude)
+        related = []
+        for sentence in matches:
+            if len(related) == self.cross_category_top_k:
+                break
+            if sentence not in excluded:
+                excluded.add(sentence)
+                related.append(sentence)
+        return related
     
-    def generate_response(self, query, relevant_knowledge):
-        """Generate a response using the appropriate LLM provider."""
+    def process_query_stream(self, query):
+        """
+        Process a user query, yielding the response as it is generated.
+        
+        Yields {"type": "token", "text": ...} events while the provider streams,
+        then a final {"type": "done", ...} event with the full response and accuracy.
+        
+        Identical queries already in flight, streamed or not, are not sent to
+        the provider again: this caller waits for that call's result and
+        receives it as a single token event.
+        """
+        cached = self._cached_response(query)
+        if cached is not None:
+            yield {"type": "token", "text": cached["response"]}
+            yield dict(cached, type="done")
+            return
         
+        key = self._flight_key(query)
+        future, leader = in_flight_queries.join(key)
+        if not leader:
+            try:
+                result = future.result()
+            except CallAbandoned:
+                # The leading stream's client went away before the answer was complete; take over the call
+                yield from self.process_query_stream(query)
+                return
+            yield {"type": "token", "text": result["response"]}
+            yield dict(result, type="done")
+            return
+        
+        settled = False
+        try:
+            for event in self._stream_query(query):
+                if event["type"] == "done":
+                    # Release the waiting callers before handing the final event to this one
+                    in_flight_queries.settle(key, future, result={k: v for k, v in event.items() if k != "type"})
+                    settled = True
+                yield event
+        finally:
+            if not settled:
+                in_flight_queries.settle(key, future, error=CallAbandoned())
+    
+    def _stream_query(self, query):
+        """Stream the answer to a query as token events followed by the done event; see process_query_stream."""
+        relevant_knowledge = self.retrieve_relevant_knowledge(query)
+        
+        chunks = []
+        outcome = {}
+        for chunk in self._stream_response(query, relevant_knowledge, outcome):
+            chunks.append(chunk)
+            yield {"type": "token", "text": chunk}
+        response = "".join(chunks)
+        
+        result = {
+            "agent": self.name,
+            "response": response,
+            "accuracy": self.verify_accuracy(query, response, relevant_knowledge),
+            "provider": outcome.get("provider"),
+            "prompt_budget": outcome.get("prompt_budget")
+        }
+        self._cache_response(query, result)
+        yield dict(result, type="done")
+    
+    def build_prompt(self, query, relevant_knowledge):
+        """Build the LLM prompt for a query and its retrieved knowledge."""
         # Prepare context with relevant knowledge
         context = "\n".join(relevant_knowledge)
         
         # Construct prompt
-        prompt = f"""You are {self.name}, an AI agent with PhD-level expertise in {self.expertise}. 
+        return f"""You are {self.name}, an AI agent with PhD-level expertise in {self.expertise}. 
 You provide evidence-based, accurate assistance on IPMDAR (Integrated Program Management Data and Reporting) for DoD acquisition projects.
 
 CONTEXT INFORMATION FROM IPMDAR IMPLEMENTATION AND TAILORING GUIDE:
@@ -76,162 +258,255 @@ Please provide a comprehensive, accurate response based on your expertise and th
 Your response must be evidence-based and directly reflect the standards and guidelines in the IPMDAR documentation.
 Format your response in a clear, professional manner suitable for DoD acquisition professionals.
 """
-
-        # Use the appropriate LLM provider based on agent type
-        if self.llm_provider == "openai":
-            return self._generate_with_openai(prompt)
-        elif self.llm_provider == "anthropic":
-            return self._generate_with_anthropic(prompt)
-        elif self.llm_provider == "groq":
-            return self._generate_with_groq(prompt)
-        elif self.llm_provider == "google":
-            return self._generate_with_google(prompt)
-        elif self.llm_provider == "cohere":
-            return self._generate_with_cohere(prompt)
-        elif self.llm_provider == "emergenceai":
-            return self._generate_with_emergenceai(prompt)
-        else:
+    
+    def system_prompt(self):
+        """Return the system message sent to the LLM provider."""
+        return f"You are {self.name}, with PhD-level expertise in {self.expertise}."
+    
+    def assemble_prompt(self, query, relevant_knowledge, provider=None):
+        """
+        Build the prompt, trimming the knowledge to fit the provider model's context window.
+        
+        Returns (prompt, report), where the report records the token estimate
+        and how many retrieved sentences were kept or dropped.
+        """
+        model = PROVIDER_MODELS.get(provider or self.llm_provider, PROVIDER_MODELS["openai"])
+        return PromptAssembler(model).assemble(self.build_prompt, query, relevant_knowledge, self.system_prompt())
+    
+    def estimated_call_tokens(self, prompt):
+        """Estimate the tokens a provider call counts against its tokens-per-minute limit."""
+        return estimate_tokens(self.system_prompt()) + estimate_tokens(prompt) + MAX_OUTPUT_TOKENS
+    
+    def provider_candidates(self):
+        """
+        Return the providers to try, best first.
+        
+        The agent may use its allowed providers (by default every provider
+        with an API key); the adaptive router keeps its home provider,
+        llm_provider, first unless that provider has degraded.
+        """
+        allowed = self.allowed_providers or [
+            provider for provider in PROVIDER_MODELS if getattr(self, f"{provider}_api_key", None)
+        ]
+        if self.llm_provider not in allowed:
+            allowed = [self.llm_provider] + list(allowed)
+        return provider_router.route(self.llm_provider, allowed)
+    
+    def response_suffix(self, query):
+        """Return text appended after the model's answer; agents override this to add domain guidance."""
+        return ""
+    
+    def generate_response(self, query, relevant_knowledge):
+        """Generate a response using the appropriate LLM provider."""
+        answer, _, _, _ = provider_clients.run(self.async_agent.answer(query, relevant_knowledge))
+        return answer + self.response_suffix(query)
+    
+    def generate_response_stream(self, query, relevant_knowledge):
+        """Yield the response in chunks as the LLM provider produces them."""
+        return self._stream_response(query, relevant_knowledge, {})
+    
+    def _stream_response(self, query, relevant_knowledge, outcome):
+        """
+        Stream the answer followed by the agent's response suffix.
+        
+        A provider that fails before sending any text is skipped in favour of
+        the next healthy one; once text has reached the caller the stream
+        cannot switch providers. The provider last tried (None if none was)
+        and the prompt budget report are stored in outcome.
+        """
+        stream_methods = {
+            "openai": self._stream_with_openai,
+            "anthropic": self._stream_with_anthropic,
+            "groq": self._stream_with_groq,
+            "google": self._stream_with_google,
+            "cohere": self._stream_with_cohere,
+            "emergenceai": self._stream_with_emergenceai
+        }
+        for provider in self.provider_candidates():
+            breaker = provider_health.breaker(provider)
+            if not breaker.allow_request():
+                continue
+            prompt, outcome["prompt_budget"] = self.assemble_prompt(query, relevant_knowledge, provider)
+            try:
+                rate_limiters.limiter(provider).acquire(self.estimated_call_tokens(prompt))
+            except RateLimitTimeout as e:
+                breaker.release()
+                print(f"Skipping {provider}: {e}")
+                continue
             # Fallback to OpenAI if provider not implemented
-            return self._generate_with_openai(prompt)
+            stream = stream_methods.get(provider, self._stream_with_openai)
+            outcome["provider"] = provider
+            start = time.monotonic()
+            started = False
+            try:
+                for chunk in stream(prompt):
+                    if chunk:
+                        started = True
+                        yield chunk
+            except GeneratorExit:
+                # The client went away mid-stream; that says nothing about the provider's health
+                breaker.release()
+                raise
+            except Exception as e:
+                breaker.record_failure(e)
+                print(f"Error streaming response with {provider}: {e}")
+                if started:
+                    yield ERROR_RESPONSE
+                    return
+                continue
+            
+            breaker.record_success(time.monotonic() - start)
+            suffix = self.response_suffix(query)
+            if suffix:
+                yield suffix
+            return
+        
+        yield ERROR_RESPONSE
     
-    def _generate_with_openai(self, prompt):
-        """Generate response using OpenAI."""
-        try:
-            client = openai.OpenAI(api_key=self.openai_api_key)
-            response = client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": f"You are {self.name}, with PhD-level expertise in {self.expertise}."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.2,
-                max_tokens=1000
-            )
-            return response.choices[0].message.content.strip()
-        except Exception as e:
-            print(f"Error generating response with OpenAI: {e}")
-            return f"I apologize, but I encountered an error when generating a response. Please try again."
+    def _generate(self, prompt):
+        """Send a prompt to the agent's LLM provider and return the completion text."""
+        # Provider calls run on the shared event loop through the async adapters
+        return provider_clients.run(self.async_agent._generate(prompt))
     
-    def _generate_with_anthropic(self, prompt):
-        """Generate response using Anthropic."""
-        try:
-            client = anthropic.Anthropic(api_key=self.anthropic_api_key)
-            response = client.messages.create(
-                model="claude-2",
-                max_tokens=1000,
-                temperature=0.2,
-                system=f"You are {self.name}, with PhD-level expertise in {self.expertise}.",
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
-            )
-            return response.content[0].text.strip()
-        except Exception as e:
-            print(f"Error generating response with Anthropic: {e}")
-            return f"I apologize, but I encountered an error when generating a response. Please try again."
+    def _iter_sse_data(self, response):
+        """Yield the decoded JSON payloads of a server-sent events response."""
+        response.raise_for_status()
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data:"):
+                continue
+            payload = line[len("data:"):].strip()
+            if payload == "[DONE]":
+                return
+            yield json.loads(payload)
     
-    def _generate_with_groq(self, prompt):
-        """Generate response using Groq."""
-        try:
-            headers = {
-                "Authorization": f"Bearer {self.groq_api_key}",
-                "Content-Type": "application/json"
-            }
-            data = {
-                "messages": [
-                    {"role": "system", "content": f"You are {self.name}, with PhD-level expertise in {self.expertise}."},
-                    {"role": "user", "content": prompt}
-                ],
-                "model": "llama2-70b-4096",
-                "temperature": 0.2,
-                "max_tokens": 1000
-            }
-            response = requests.post("https://api.groq.com/openai/v1/chat/completions", 
-                                    headers=headers, 
-                                    json=data)
-            response_json = response.json()
-            return response_json["choices"][0]["message"]["content"].strip()
-        except Exception as e:
-            print(f"Error generating response with Groq: {e}")
-            return f"I apologize, but I encountered an error when generating a response. Please try again."
+    def _stream_with_openai(self, prompt):
+        """Stream a response from OpenAI."""
+        client = provider_clients.openai_client(self.openai_api_key)
+        stream = client.chat.completions.create(
+            model=PROVIDER_MODELS["openai"],
+            messages=[
+                {"role": "system", "content": self.system_prompt()},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.2,
+            max_tokens=MAX_OUTPUT_TOKENS,
+            stream=True
+        )
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
     
-    def _generate_with_google(self, prompt):
-        """Generate response using Google's Gemini API."""
-        try:
-            url = "https://generativelanguage.googleapis.com/v1beta/models/gemini-pro:generateContent"
-            headers = {
-                "Content-Type": "application/json",
-            }
-            data = {
-                "contents": [
-                    {
-                        "role": "user",
-                        "parts": [{"text": prompt}]
-                    }
-                ],
-                "generationConfig": {
-                    "temperature": 0.2,
-                    "maxOutputTokens": 1000
-                }
-            }
-            response = requests.post(
-                f"{url}?key={self.google_api_key}",
-                headers=headers,
-                json=data
-            )
-            response_json = response.json()
-            return response_json["candidates"][0]["content"]["parts"][0]["text"].strip()
-        except Exception as e:
-            print(f"Error generating response with Google: {e}")
-            return f"I apologize, but I encountered an error when generating a response. Please try again."
+    def _stream_with_anthropic(self, prompt):
+        """Stream a response from Anthropic."""
+        client = provider_clients.anthropic_client(self.anthropic_api_key)
+        stream = client.messages.create(
+            model=PROVIDER_MODELS["anthropic"],
+            max_tokens=MAX_OUTPUT_TOKENS,
+            temperature=0.2,
+            system=self.system_prompt(),
+            messages=[
+                {"role": "user", "content": prompt}
+            ],
+            stream=True
+        )
+        for event in stream:
+            if event.type == "content_block_delta":
+                yield event.delta.text
     
-    def _generate_with_cohere(self, prompt):
-        """Generate response using Cohere."""
-        try:
-            url = "https://api.cohere.ai/v1/generate"
-            headers = {
-                "Authorization": f"Bearer {self.cohere_api_key}",
-                "Content-Type": "application/json"
-            }
-            data = {
-                "model": "command-light",
-                "prompt": prompt,
-                "max_tokens": 1000,
-                "temperature": 0.2,
-                "k": 0,
-                "stop_sequences": [],
-                "return_likelihoods": "NONE"
-            }
-            response = requests.post(url, headers=headers, json=data)
-            response_json = response.json()
-            return response_json["generations"][0]["text"].strip()
-        except Exception as e:
-            print(f"Error generating response with Cohere: {e}")
-            return f"I apologize, but I encountered an error when generating a response. Please try again."
+    def _stream_with_groq(self, prompt):
+        """Stream a response from Groq's OpenAI-compatible endpoint."""
+        headers = {
+            "Authorization": f"Bearer {self.groq_api_key}",
+            "Content-Type": "application/json"
+        }
+        data = {
+            "messages": [
+                {"role": "system", "content": self.system_prompt()},
+                {"role": "user", "content": prompt}
+            ],
+            "model": PROVIDER_MODELS["groq"],
+            "temperature": 0.2,
+            "max_tokens": MAX_OUTPUT_TOKENS,
+            "stream": True
+        }
+        response = provider_clients.post("groq", "https://api.groq.com/openai/v1/chat/completions",
+                                         headers=headers, json=data, stream=True)
+        with response:
+            for event in self._iter_sse_data(response):
+                yield event["choices"][0]["delta"].get("content", "")
     
-    def _generate_with_emergenceai(self, prompt):
-        """Generate response using EmergenceAI."""
-        try:
-            url = "https://api.emergence.ai/v1/chat/completions"
-            headers = {
-                "Authorization": f"Bearer {self.emergenceai_api_key}",
-                "Content-Type": "application/json"
-            }
-            data = {
-                "model": "emergence-7b",
-                "messages": [
-                    {"role": "system", "content": f"You are {self.name}, with PhD-level expertise in {self.expertise}."},
-                    {"role": "user", "content": prompt}
-                ],
+    def _stream_with_google(self, prompt):
+        """Stream a response from Google's Gemini API."""
+        url = f"https://generativelanguage.googleapis.com/v1beta/models/{PROVIDER_MODELS['google']}:streamGenerateContent"
+        data = {
+            "contents": [
+                {
+                    "role": "user",
+                    "parts": [{"text": prompt}]
+                }
+            ],
+            "generationConfig": {
                 "temperature": 0.2,
-                "max_tokens": 1000
+                "maxOutputTokens": MAX_OUTPUT_TOKENS
             }
-            response = requests.post(url, headers=headers, json=data)
-            response_json = response.json()
-            return response_json["choices"][0]["message"]["content"].strip()
-        except Exception as e:
-            print(f"Error generating response with EmergenceAI: {e}")
-            return f"I apologize, but I encountered an error when generating a response. Please try again."
+        }
+        response = provider_clients.post("google", f"{url}?alt=sse&key={self.google_api_key}",
+                                         headers={"Content-Type": "application/json"}, json=data, stream=True)
+        with response:
+            for event in self._iter_sse_data(response):
+                for candidate in event.get("candidates", [])[:1]:
+                    for part in candidate.get("content", {}).get("parts", []):
+                        yield part.get("text", "")
+    
+    def _stream_with_cohere(self, prompt):
+        """Stream a response from Cohere, which sends one JSON object per line."""
+        headers = {
+            "Authorization": f"Bearer {self.cohere_api_key}",
+            "Content-Type": "application/json"
+        }
+        data = {
+            "model": PROVIDER_MODELS["cohere"],
+            "prompt": prompt,
+            "max_tokens": MAX_OUTPUT_TOKENS,
+            "temperature": 0.2,
+            "k": 0,
+            "stop_sequences": [],
+            "return_likelihoods": "NONE",
+            "stream": True
+        }
+        response = provider_clients.post("cohere", "https://api.cohere.ai/v1/generate",
+                                         headers=headers, json=data, stream=True)
+        with response:
+            response.raise_for_status()
+            for line in response.iter_lines(decode_unicode=True):
+                if not line:
+                    continue
+                event = json.loads(line)
+                if event.get("is_finished"):
+                    return
+                yield event.get("text", "")
+    
+    def _stream_with_emergenceai(self, prompt):
+        """Stream a response from EmergenceAI's OpenAI-compatible endpoint."""
+        headers = {
+            "Authorization": f"Bearer {self.emergenceai_api_key}",
+            "Content-Type": "application/json"
+        }
+        data = {
+            "model": PROVIDER_MODELS["emergenceai"],
+            "messages": [
+                {"role": "system", "content": self.system_prompt()},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.2,
+            "max_tokens": MAX_OUTPUT_TOKENS,
+            "stream": True
+        }
+        response = provider_clients.post("emergenceai", "https://api.emergence.ai/v1/chat/completions",
+                                         headers=headers, json=data, stream=True)
+        with response:
+            for event in self._iter_sse_data(response):
+                yield event["choices"][0]["delta"].get("content", "")
     
     def verify_accuracy(self, query, response, relevant_knowledge):
         """Verify the accuracy of the response against the IPMDAR knowledge base."""
@@ -246,3 +521,345 @@ Format your response in a clear, professional manner suitable for DoD acquisitio
     def get_expertise_description(self):
         """Return a description of this agent's expertise."""
         pass
+
+
+class AsyncBaseAgent:
+    """
+    Asyncio front end for an agent.
+    
+    Wraps a BaseAgent and answers queries as coroutines, calling the LLM
+    providers through pooled async HTTP clients, so one event loop can keep
+    hundreds of provider calls in flight. Retrieval, prompts, response
+    suffixes and accuracy checks come from the wrapped agent, so subclass
+    customizations apply unchanged. The synchronous BaseAgent API makes its
+    provider calls through these adapters on the shared event loop.
+    """
+    
+    def __init__(self, agent):
+        self.agent = agent
+    
+    async def process_query(self, query):
+        """Process a user query and return a response with accuracy rating."""
+        agent = self.agent
+        cached = agent._cached_response(query)
+        if cached is not None:
+            return dict(cached)
+        
+        # Shares in-flight calls with the synchronous API; see BaseAgent.process_query
+        result = await in_flight_queries.run_async(agent._flight_key(query), lambda: self._process_query(query))
+        return dict(result)
+    
+    async def _process_query(self, query):
+        agent = self.agent
+        relevant_knowledge = agent.retrieve_relevant_knowledge(query)
+        answer, prompt_budget, provider, hedge = await self.answer(query, relevant_knowledge)
+        response = answer + agent.response_suffix(query)
+        
+        result = {
+            "agent": agent.name,
+            "response": response,
+            "accuracy": agent.verify_accuracy(query, response, relevant_knowledge),
+            "provider": provider,
+            "hedge": hedge,
+            "prompt_budget": prompt_budget
+        }
+        agent._cache_response(query, result)
+        return result
+    
+    async def generate_response(self, query, relevant_knowledge):
+        """Generate a response using the agent's LLM provider."""
+        answer, _, _, _ = await self.answer(query, relevant_knowledge)
+        return answer + self.agent.response_suffix(query)
+    
+    async def answer(self, query, relevant_knowledge):
+        """
+        Answer a query from its retrieved knowledge, without the agent's response suffix.
+        
+        Returns (text, prompt_budget, provider, hedge); the prompt is assembled
+        for whichever provider ends up answering, and hedge describes the
+        hedged request if one was sent.
+        """
+        return await self._generate_with_failover(
+            lambda provider: self.agent.assemble_prompt(query, relevant_knowledge, provider)
+        )
+    
+    async def _generate(self, prompt):
+        """Send a prompt to the agent's LLM provider and return the completion text."""
+        text, _, _, _ = await self._generate_with_failover(lambda provider: (prompt, None))
+        return text
+    
+    async def _generate_with_failover(self, assemble):
+        """
+        Call the agent's provider, retrying with backoff and then failing over to the next healthy provider.
+        
+        assemble(provider) returns the (prompt, prompt_budget) to send to that
+        provider. Providers whose circuit breaker is open are skipped, and
+        every attempt shares the agent's latency budget.
+        
+        Returns:
+            tuple: (text, prompt_budget, provider, hedge); text is ERROR_RESPONSE
+            and provider None when no provider answered within the budget
+        """
+        agent = self.agent
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + agent.latency_budget_seconds
+        prompt_budget = None
+        for provider in agent.provider_candidates():
+            breaker = provider_health.breaker(provider)
+            prompt = None
+            for attempt in range(RETRY_ATTEMPTS + 1):
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    print(f"{agent.name} used its {agent.latency_budget_seconds:.0f}s latency budget without an answer")
+                    return ERROR_RESPONSE, prompt_budget, None, None
+                if not breaker.allow_request():
+                    break
+                if prompt is None:
+                    prompt, prompt_budget = assemble(provider)
+                
+                try:
+                    text, winner, hedge = await asyncio.wait_for(self._call_hedged(provider, prompt, assemble), remaining)
+                except asyncio.TimeoutError as e:
+                    breaker.record_failure(e)
+                    print(f"{provider} did not answer within {agent.name}'s latency budget")
+                    continue
+                except RateLimitTimeout as e:
+                    # The provider's queue is too long to wait in; try the next provider instead
+                    print(f"Skipping {provider}: {e}")
+                    break
+                except Exception as e:
+                    print(f"Error generating response with {provider} (attempt {attempt + 1}): {e!r}")
+                    if attempt < RETRY_ATTEMPTS:
+                        await asyncio.sleep(min(backoff_delay(attempt), max(0.0, deadline - loop.time())))
+                    continue
+                
+                if hedge and hedge["winner"] == hedge["secondary"]:
+                    prompt_budget = hedge.pop("prompt_budget")
+                elif hedge:
+                    hedge.pop("prompt_budget")
+                return text, prompt_budget, winner, hedge
+        
+        print(f"No provider could answer for {agent.name}")
+        return ERROR_RESPONSE, prompt_budget, None, None
+    
+    async def _call_hedged(self, provider, prompt, assemble):
+        """
+        Call a provider, hedging to the agent's secondary provider when it is slow.
+        
+        If the primary has not answered by its observed p95 latency and the
+        hedge budget allows, the prompt is also sent to agent.hedge_provider;
+        the first successful answer wins and the other call is cancelled.
+        
+        Returns:
+            tuple: (text, provider that answered, hedge report or None if no hedge was sent)
+        """
+        agent = self.agent
+        hedge_provider = agent.hedge_provider
+        if not hedge_provider or hedge_provider == provider:
+            return await self._tracked_call(provider, prompt), provider, None
+        
+        hedge_budget.record_call()
+        primary = asyncio.ensure_future(self._tracked_call(provider, prompt))
+        hedge_delay = provider_health.breaker(provider).latency_percentile(0.95)
+        if hedge_delay is None:
+            # Not enough latency history yet to know what slow means for this provider
+            return await primary, provider, None
+        
+        secondary = None
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=hedge_delay)
+            if done:
+                return primary.result(), provider, None
+            
+            hedge_breaker = provider_health.breaker(hedge_provider)
+            if not hedge_breaker.allow_request():
+                return await primary, provider, None
+            if not hedge_budget.try_spend():
+                hedge_breaker.release()
+                return await primary, provider, None
+            
+            hedge_prompt, hedge_prompt_budget = assemble(hedge_provider)
+            secondary = asyncio.ensure_future(self._tracked_call(hedge_provider, hedge_prompt))
+            calls = {primary: provider, secondary: hedge_provider}
+            pending = set(calls)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        winner = calls[task]
+                        return task.result(), winner, {
+                            "primary": provider,
+                            "secondary": hedge_provider,
+                            "winner": winner,
+                            "hedge_after_seconds": hedge_delay,
+                            "prompt_budget": hedge_prompt_budget
+                        }
+            # Both calls failed; report the primary's error
+            raise primary.exception()
+        finally:
+            # Cancel the losing call, or both calls if the caller gave up
+            for task in (primary, secondary):
+                if task is not None and not task.done():
+                    task.cancel()
+    
+    async def _tracked_call(self, provider, prompt):
+        """Call a provider within its rate limits and record the outcome on its circuit breaker."""
+        breaker = provider_health.breaker(provider)
+        # Queue behind the provider's rate limits; a call refused here never reaches the provider
+        try:
+            await rate_limiters.limiter(provider).acquire_async(self.agent.estimated_call_tokens(prompt))
+        except (RateLimitTimeout, asyncio.CancelledError):
+            breaker.release()
+            raise
+        
+        start = time.monotonic()
+        try:
+            text = await self._call_provider(provider, prompt)
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
+        except Exception as e:
+            breaker.record_failure(e)
+            raise
+        breaker.record_success(time.monotonic() - start)
+        return text
+    
+    async def _call_provider(self, provider, prompt):
+        """Send a prompt to one provider and return the completion text; errors propagate."""
+        generate_methods = {
+            "openai": self._generate_with_openai,
+            "anthropic": self._generate_with_anthropic,
+            "groq": self._generate_with_groq,
+            "google": self._generate_with_google,
+            "cohere": self._generate_with_cohere,
+            "emergenceai": self._generate_with_emergenceai
+        }
+        # Fallback to OpenAI if provider not implemented
+        generate = generate_methods.get(provider, self._generate_with_openai)
+        return await generate(prompt)
+    
+    async def _generate_with_openai(self, prompt):
+        """Generate response using OpenAI."""
+        agent = self.agent
+        client = provider_clients.async_openai_client(agent.openai_api_key)
+        response = await client.chat.completions.create(
+            model=PROVIDER_MODELS["openai"],
+            messages=[
+                {"role": "system", "content": agent.system_prompt()},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.2,
+            max_tokens=MAX_OUTPUT_TOKENS
+        )
+        return response.choices[0].message.content.strip()
+    
+    async def _generate_with_anthropic(self, prompt):
+        """Generate response using Anthropic."""
+        agent = self.agent
+        client = provider_clients.async_anthropic_client(agent.anthropic_api_key)
+        response = await client.messages.create(
+            model=PROVIDER_MODELS["anthropic"],
+            max_tokens=MAX_OUTPUT_TOKENS,
+            temperature=0.2,
+            system=agent.system_prompt(),
+            messages=[
+                {"role": "user", "content": prompt}
+            ]
+        )
+        return response.content[0].text.strip()
+    
+    async def _generate_with_groq(self, prompt):
+        """Generate response using Groq."""
+        agent = self.agent
+        headers = {
+            "Authorization": f"Bearer {agent.groq_api_key}",
+            "Content-Type": "application/json"
+        }
+        data = {
+            "messages": [
+                {"role": "system", "content": agent.system_prompt()},
+                {"role": "user", "content": prompt}
+            ],
+            "model": PROVIDER_MODELS["groq"],
+            "temperature": 0.2,
+            "max_tokens": MAX_OUTPUT_TOKENS
+        }
+        response = await provider_clients.async_post("groq", "https://api.groq.com/openai/v1/chat/completions", 
+                                                     headers=headers, 
+                                                     json=data)
+        response.raise_for_status()
+        response_json = response.json()
+        return response_json["choices"][0]["message"]["content"].strip()
+    
+    async def _generate_with_google(self, prompt):
+        """Generate response using Google's Gemini API."""
+        agent = self.agent
+        url = f"https://generativelanguage.googleapis.com/v1beta/models/{PROVIDER_MODELS['google']}:generateContent"
+        headers = {
+            "Content-Type": "application/json",
+        }
+        data = {
+            "contents": [
+                {
+                    "role": "user",
+                    "parts": [{"text": prompt}]
+                }
+            ],
+            "generationConfig": {
+                "temperature": 0.2,
+                "maxOutputTokens": MAX_OUTPUT_TOKENS
+            }
+        }
+        response = await provider_clients.async_post(
+            "google",
+            f"{url}?key={agent.google_api_key}",
+            headers=headers,
+            json=data
+        )
+        response.raise_for_status()
+        response_json = response.json()
+        return response_json["candidates"][0]["content"]["parts"][0]["text"].strip()
+    
+    async def _generate_with_cohere(self, prompt):
+        """Generate response using Cohere."""
+        agent = self.agent
+        url = "https://api.cohere.ai/v1/generate"
+        headers = {
+            "Authorization": f"Bearer {agent.cohere_api_key}",
+            "Content-Type": "application/json"
+        }
+        data = {
+            "model": PROVIDER_MODELS["cohere"],
+            "prompt": prompt,
+            "max_tokens": MAX_OUTPUT_TOKENS,
+            "temperature": 0.2,
+            "k": 0,
+            "stop_sequences": [],
+            "return_likelihoods": "NONE"
+        }
+        response = await provider_clients.async_post("cohere", url, headers=headers, json=data)
+        response.raise_for_status()
+        response_json = response.json()
+        return response_json["generations"][0]["text"].strip()
+    
+    async def _generate_with_emergenceai(self, prompt):
+        """Generate response using EmergenceAI."""
+        agent = self.agent
+        url = "https://api.emergence.ai/v1/chat/completions"
+        headers = {
+            "Authorization": f"Bearer {agent.emergenceai_api_key}",
+            "Content-Type": "application/json"
+        }
+        data = {
+            "model": PROVIDER_MODELS["emergenceai"],
+            "messages": [
+                {"role": "system", "content": agent.system_prompt()},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.2,
+            "max_tokens": MAX_OUTPUT_TOKENS
+        }
+        response = await provider_clients.async_post("emergenceai", url, headers=headers, json=data)
+        response.raise_for_status()
+        response_json = response.json()
+        return response_json["choices"][0]["message"]["content"].strip()
@@ -0,0 +1,159 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+
+from agents.base_agent import ERROR_RESPONSE
+
+# Words in an analysis that mean the reviewing agent found a problem with the winning response
+CORRECTION_INDICATORS = ["incorrect", "inaccurate", "error", "mistake", "wrong", "false"]
+
+class CompetitionEngine:
+    """
+    Runs agent competitions for /api/compete.
+
+    All competitors answer the query concurrently and the first to finish with
+    a successful answer wins, timed by the wall clock; error responses, such as
+    a rate-limit apology, cannot win. As soon as the winner is known the other agents
+    review its response in parallel, each proposing a correction if it finds a
+    problem. The whole run is bounded by a single deadline.
+    """
+
+    def __init__(self, executor, deadline_seconds=90.0):
+        self.executor = executor
+        self.deadline_seconds = deadline_seconds
+
+    def run(self, query, competitors):
+        """
+        Run a competition between agents.
+
+        Args:
+            query: The user's query
+            competitors: Dict of agent id -> agent for the certified agents taking part
+
+        Returns:
+            dict: Winner, timings, analyses and any correction, or an error message
+        """
+        start = time.perf_counter()
+        deadline = start + self.deadline_seconds
+
+        winner, winning_response, finish_times = self._race(query, competitors, start, deadline)
+        if winner is None:
+            return {"error": "No agent completed a successful response before the competition deadline"}
+
+        reviewers = {name: agent for name, agent in competitors.items() if name != winner}
+        analyses, corrections = self._review(query, winning_response, reviewers, start, deadline)
+
+        # The first correction to arrive wins
+        correction_winner = None
+        correction_response = None
+        if corrections:
+            correction_winner = min(corrections, key=lambda name: corrections[name]["time"])
+            correction_response = corrections[correction_winner]["response"]
+
+        return {
+            "winner": winner,
+            "winning_time": finish_times[winner],
+            "winning_response": winning_response["response"],
+            "winning_provider": winning_response.get("provider", competitors[winner].llm_provider),
+            "finish_times": finish_times,
+            "analyses": analyses,
+            "correction_needed": bool(corrections),
+            "correction_winner": correction_winner,
+            "correction_response": correction_response,
+            "total_time": time.perf_counter() - start
+        }
+
+    @staticmethod
+    def _is_error(response):
+        """Whether an agent response is an error, such as a rate-limit apology, rather than an answer."""
+        return bool(response.get("error")) or ERROR_RESPONSE in response["response"]
+
+    def _timed(self, func, start, *args):
+        """Call func and return its result with the seconds elapsed since start."""
+        result = func(*args)
+        return result, time.perf_counter() - start
+
+    def _race(self, query, competitors, start, deadline):
+        """
+        Run every competitor concurrently and return (winner, response, finish_times).
+
+        Competitors that finish with an error response are timed but skipped,
+        and the race keeps waiting for a successful answer until the deadline.
+        """
+        race = {
+            self.executor.submit(self._timed, agent.process_query, start, query): name
+            for name, agent in competitors.items()
+        }
+        finish_times = {}
+        responses = {}
+        pending = set(race)
+
+        while pending and not responses:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = race[future]
+                try:
+                    response, finish_times[name] = future.result()
+                except Exception as e:
+                    print(f"Error with {name} agent in competition: {str(e)}")
+                    continue
+                if self._is_error(response):
+                    print(f"{name} agent finished with an error response; it cannot win the competition")
+                    continue
+                responses[name] = response
+
+        # Slower competitors can no longer win; drop any that have not started yet
+        for future in pending:
+            future.cancel()
+
+        if not responses:
+            return None, None, finish_times
+        winner = min(responses, key=finish_times.get)
+        return winner, responses[winner], finish_times
+
+    def _review_response(self, agent, query, winning_response, start):
+        """
+        Have one agent analyze the winning response and correct it if needed.
+
+        A failed analysis call is reported as is and never triggers a correction
+        ("error" is a correction indicator), and a failed correction is dropped.
+        """
+        analysis_prompt = f"The following is a response to the query: '{query}'. Please analyze it for accuracy and provide feedback: {winning_response['response']}"
+        analysis_response = agent.process_query(analysis_prompt)
+        analysis = analysis_response["response"]
+        if self._is_error(analysis_response):
+            return analysis, None
+
+        correction = None
+        if any(indicator in analysis.lower() for indicator in CORRECTION_INDICATORS):
+            correction_prompt = f"The following response to '{query}' contains inaccuracies. Please provide a corrected response: {winning_response['response']}"
+            response, finish_time = self._timed(agent.process_query, start, correction_prompt)
+            if not self._is_error(response):
+                correction = {"response": response["response"], "time": finish_time}
+        return analysis, correction
+
+    def _review(self, query, winning_response, reviewers, start, deadline):
+        """Run all reviews in parallel and return (analyses, corrections)."""
+        reviews = {
+            self.executor.submit(self._review_response, agent, query, winning_response, start): name
+            for name, agent in reviewers.items()
+        }
+        done, pending = wait(reviews, timeout=max(0.0, deadline - time.perf_counter()))
+
+        analyses = {}
+        corrections = {}
+        for future, name in reviews.items():
+            if future in pending:
+                future.cancel()
+                analyses[name] = "This agent did not finish its analysis before the competition deadline."
+                continue
+            try:
+                analyses[name], correction = future.result()
+                if correction:
+                    corrections[name] = correction
+            except Exception as e:
+                print(f"Error with {name} agent during analysis: {str(e)}")
+                analyses[name] = f"I apologize, but I encountered an error when analyzing the response. Please try again."
+        return analyses, corrections
@@ -6,6 +6,13 @@ class DataAnalyticsAgent(BaseAgent):
     cost-schedule integration, and Earned Value Management (EVM) metrics.
     """
     
+    # Keywords used to pull related sentences from other knowledge categories
+    ANALYTICS_KEYWORDS = [
+        "analytics", "metrics", "measurement", "data", "report", "dashboard", 
+        "analysis", "trend", "statistic", "calculation", "EVM", "earned value", 
+        "performance", "indicator", "SPI", "CPI", "variance", "forecast"
+    ]
+    
     def __init__(self, knowledge_base):
         super().__init__(
             knowledge_base=knowledge_base,
@@ -14,6 +21,10 @@ class DataAnalyticsAgent(BaseAgent):
         )
         self.knowledge_category = "data_analytics"
         self.llm_provider = "anthropic"  # Using Anthropic for data analytics agent
+        
+        # Index this agent's keywords once at load time rather than on every query
+        if "_keywords" in self.knowledge_base:
+            self.knowledge_base["_keywords"].add_keywords(self.ANALYTICS_KEYWORDS)
     
     def get_expertise_description(self):
         return """Specialist in analyzing IPMDAR performance data, cost-schedule integration, and Earned Value Management (EVM) metrics.
@@ -33,36 +44,20 @@ Specializes in:
         # Get base knowledge
         knowledge = super().retrieve_relevant_knowledge(query)
         
-        # Add any analytics-specific filtering or processing here
-        analytics_keywords = [
-            "analytics", "metrics", "measurement", "data", "report", "dashboard", 
-            "analysis", "trend", "statistic", "calculation", "EVM", "earned value", 
-            "performance", "indicator", "SPI", "CPI", "variance", "forecast"
-        ]
-        
         # Check if query is analytics-focused
         query_lower = query.lower()
-        analytics_focused = any(keyword in query_lower for keyword in analytics_keywords)
+        analytics_focused = any(keyword.lower() in query_lower for keyword in self.ANALYTICS_KEYWORDS)
         
         if analytics_focused:
-            # Add more analytics-related knowledge if available
-            for category in ["risk_forecasting", "implementation"]:
-                if category in self.knowledge_base:
-                    # Filter for analytics-related items in other categories
-                    for item in self.knowledge_base[category]:
-                        item_lower = item.lower()
-                        if any(keyword in item_lower for keyword in analytics_keywords):
-                            knowledge.append(item)
+            # Add the best analytics-related matches from other categories, found with the precomputed keyword postings
+            knowledge.extend(self.related_knowledge(query, self.ANALYTICS_KEYWORDS, ["risk_forecasting", "implementation"], exclude=knowledge))
         
         return knowledge
         
-    def generate_response(self, query, relevant_knowledge):
+    def response_suffix(self, query):
         """Override to customize response generation for data analytics."""
         # In a real implementation, this could include data visualization code
         # or analytics-specific formatting
-        base_response = super().generate_response(query, relevant_knowledge)
         
         # Add standard note about data analytics best practices
-        note = "\n\nNote: All data analytics recommendations follow the standard IPMDAR metrics and calculations as defined in the IPMDAR Implementation and Tailoring Guide."
-        
-        return base_response + note
+        return "\n\nNote: All data analytics recommendations follow the standard IPMDAR metrics and calculations as defined in the IPMDAR Implementation and Tailoring Guide."
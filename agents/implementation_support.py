@@ -47,11 +47,8 @@ Specializes in:
             
         return knowledge
         
-    def generate_response(self, query, relevant_knowledge):
+    def response_suffix(self, query):
         """Override to provide a more interactive, step-by-step response style."""
-        # Get standard response
-        response = super().generate_response(query, relevant_knowledge)
-        
         # Add some conversational elements to make it more interactive
         interactive_elements = [
             "\n\nIs there a specific part of the implementation process you'd like me to elaborate on?",
@@ -64,6 +61,6 @@ Specializes in:
         import random
         # Add an interactive element 30% of the time
         if random.random() < 0.3:
-            response += random.choice(interactive_elements)
+            return random.choice(interactive_elements)
             
-        return response
+        return ""
@@ -0,0 +1,104 @@
+import re
+import math
+
+# Output tokens requested from every provider; reserved out of the context window
+MAX_OUTPUT_TOKENS = 1000
+
+# Context window, in tokens, of each model the agents use
+MODEL_CONTEXT_WINDOWS = {
+    "gpt-4": 8192,
+    "claude-2": 100000,
+    "llama2-70b-4096": 4096,
+    "gemini-pro": 30720,
+    "command-light": 4096,
+    "emergence-7b": 4096
+}
+
+DEFAULT_CONTEXT_WINDOW = 4096
+
+# Fraction of the window held back to absorb estimation error and chat formatting tokens
+SAFETY_MARGIN = 0.05
+
+# Pieces a BPE or SentencePiece tokenizer never merges across: letter runs, digit runs, single symbols
+TOKEN_PIECE_PATTERN = re.compile(r"[A-Z]{2,}(?![a-z])|[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+
+def estimate_tokens(text):
+    """
+    Estimate the number of tokens a provider tokenizer produces for text.
+
+    Ordinary words cost one token per eight letters, all-caps acronyms (which
+    tokenizers split finely) one per two letters, numbers one per three
+    digits and every symbol one token. This errs high for the GPT tokenizers
+    and tracks the smaller Llama vocabulary closely.
+    """
+    tokens = 0
+    for piece in TOKEN_PIECE_PATTERN.findall(text):
+        if piece.isdigit():
+            tokens += math.ceil(len(piece) / 3)
+        elif piece.isalpha():
+            tokens += math.ceil(len(piece) / (2 if piece.isupper() and len(piece) > 1 else 8))
+        else:
+            tokens += 1
+    return tokens
+
+class PromptAssembler:
+    """
+    Fits retrieved knowledge into a model's context window.
+
+    The window is split into the reserved output tokens, a safety margin, the
+    fixed prompt (instructions, system message and query) and whatever is
+    left for knowledge sentences. Sentences are taken in retrieval order,
+    which ranks them by relevance, skipping duplicates and any sentence that
+    no longer fits.
+    """
+
+    def __init__(self, model, context_window=None, max_output_tokens=MAX_OUTPUT_TOKENS):
+        self.model = model
+        self.context_window = context_window or MODEL_CONTEXT_WINDOWS.get(model, DEFAULT_CONTEXT_WINDOW)
+        self.max_output_tokens = max_output_tokens
+
+    @property
+    def input_budget(self):
+        """Tokens available for the whole prompt."""
+        return int(self.context_window * (1 - SAFETY_MARGIN)) - self.max_output_tokens
+
+    def assemble(self, build_prompt, query, relevant_knowledge, system_prompt=""):
+        """
+        Build the prompt with as much relevant knowledge as fits the budget.
+
+        Args:
+            build_prompt: Callable (query, sentences) -> prompt text
+            query: The user's query
+            relevant_knowledge: Retrieved sentences, most relevant first
+            system_prompt: System message sent alongside the prompt
+
+        Returns:
+            tuple: (prompt, report) where report describes the trimming decisions
+        """
+        overhead = estimate_tokens(build_prompt(query, [])) + estimate_tokens(system_prompt)
+        knowledge_budget = self.input_budget - overhead
+
+        candidates = list(dict.fromkeys(relevant_knowledge))
+        included = []
+        knowledge_tokens = 0
+        for sentence in candidates:
+            # Each sentence also costs the newline joining it to the context
+            cost = estimate_tokens(sentence) + 1
+            if knowledge_tokens + cost <= knowledge_budget:
+                included.append(sentence)
+                knowledge_tokens += cost
+
+        report = {
+            "model": self.model,
+            "context_window": self.context_window,
+            "max_output_tokens": self.max_output_tokens,
+            "prompt_tokens": overhead + knowledge_tokens,
+            "knowledge_tokens": knowledge_tokens,
+            "sentences_retrieved": len(relevant_knowledge),
+            "sentences_included": len(included),
+            "duplicates_dropped": len(relevant_knowledge) - len(candidates),
+            "sentences_trimmed": len(candidates) - len(included),
+            "trimmed": len(included) < len(candidates),
+            "overflow": knowledge_budget < 0
+        }
+        return build_prompt(query, included), report
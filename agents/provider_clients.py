@@ -0,0 +1,187 @@
+import asyncio
+import threading
+
+# The provider SDKs and HTTP libraries are imported when their first client is created,
+# keeping them off the application's startup path
+
+# Keep-alive connections held open per provider; sized for the agents that share each provider
+PROVIDER_POOL_SIZES = {
+    "openai": 20,
+    "anthropic": 20,
+    "groq": 10,
+    "google": 10,
+    "cohere": 10,
+    "emergenceai": 10
+}
+
+# (connect, read) timeouts in seconds for each provider
+PROVIDER_TIMEOUTS = {
+    "openai": (5.0, 60.0),
+    "anthropic": (5.0, 60.0),
+    "groq": (5.0, 30.0),
+    "google": (5.0, 60.0),
+    "cohere": (5.0, 60.0),
+    "emergenceai": (5.0, 60.0)
+}
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_TIMEOUT = (5.0, 60.0)
+
+class ProviderClientRegistry:
+    """
+    Process-wide registry of LLM provider clients.
+
+    SDK clients (OpenAI, Anthropic) and HTTP sessions (Groq, Google, Cohere,
+    EmergenceAI) are created once per provider and API key and then shared by
+    every agent, so calls reuse pooled keep-alive connections instead of paying
+    a TCP and TLS handshake each time.
+
+    SDK retries are disabled; agents retry and fail over between providers
+    themselves (see agents.resilience).
+
+    Asyncio clients are pooled the same way, one set per event loop. The
+    registry also owns a shared event loop running on a background thread, so
+    synchronous callers can hand provider calls to a single loop that
+    multiplexes every in-flight request.
+    """
+
+    def __init__(self, pool_sizes=None, timeouts=None):
+        self.pool_sizes = dict(PROVIDER_POOL_SIZES, **(pool_sizes or {}))
+        self.timeouts = dict(PROVIDER_TIMEOUTS, **(timeouts or {}))
+        self._clients = {}
+        self._lock = threading.Lock()
+        self._loop = None
+
+    def pool_size(self, provider):
+        return self.pool_sizes.get(provider, DEFAULT_POOL_SIZE)
+
+    def timeout(self, provider):
+        return self.timeouts.get(provider, DEFAULT_TIMEOUT)
+
+    def _get_or_create(self, key, factory):
+        client = self._clients.get(key)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(key)
+                if client is None:
+                    client = factory()
+                    self._clients[key] = client
+        return client
+
+    def _httpx_client(self, provider):
+        import httpx
+        connect_timeout, read_timeout = self.timeout(provider)
+        pool_size = self.pool_size(provider)
+        return httpx.Client(
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout)
+        )
+
+    def _async_httpx_client(self, provider):
+        import httpx
+        connect_timeout, read_timeout = self.timeout(provider)
+        pool_size = self.pool_size(provider)
+        return httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout)
+        )
+
+    def openai_client(self, api_key):
+        """Return the shared OpenAI client for an API key."""
+        import openai
+        return self._get_or_create(
+            ("openai", api_key),
+            lambda: openai.OpenAI(api_key=api_key, max_retries=0, http_client=self._httpx_client("openai"))
+        )
+
+    def anthropic_client(self, api_key):
+        """Return the shared Anthropic client for an API key."""
+        import anthropic
+        return self._get_or_create(
+            ("anthropic", api_key),
+            lambda: anthropic.Anthropic(api_key=api_key, max_retries=0, http_client=self._httpx_client("anthropic"))
+        )
+
+    def async_openai_client(self, api_key):
+        """Return the shared async OpenAI client for an API key on the running event loop."""
+        import openai
+        return self._get_or_create(
+            ("async-openai", api_key, asyncio.get_running_loop()),
+            lambda: openai.AsyncOpenAI(api_key=api_key, max_retries=0, http_client=self._async_httpx_client("openai"))
+        )
+
+    def async_anthropic_client(self, api_key):
+        """Return the shared async Anthropic client for an API key on the running event loop."""
+        import anthropic
+        return self._get_or_create(
+            ("async-anthropic", api_key, asyncio.get_running_loop()),
+            lambda: anthropic.AsyncAnthropic(api_key=api_key, max_retries=0, http_client=self._async_httpx_client("anthropic"))
+        )
+
+    def async_http_client(self, provider):
+        """Return the shared httpx.AsyncClient for a REST provider on the running event loop."""
+        return self._get_or_create(
+            ("async-http", provider, asyncio.get_running_loop()),
+            lambda: self._async_httpx_client(provider)
+        )
+
+    async def async_post(self, provider, url, **kwargs):
+        """POST through the provider's pooled async client."""
+        return await self.async_http_client(provider).post(url, **kwargs)
+
+    def loop(self):
+        """Return the shared event loop, starting its thread on first use."""
+        if self._loop is None:
+            with self._lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    threading.Thread(target=loop.run_forever, name="provider-loop", daemon=True).start()
+                    self._loop = loop
+        return self._loop
+
+    def submit(self, coroutine):
+        """Schedule a coroutine on the shared event loop and return a concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop())
+
+    def run(self, coroutine, timeout=None):
+        """Run a coroutine on the shared event loop and block until it finishes."""
+        return self.submit(coroutine).result(timeout)
+
+    def session(self, provider):
+        """Return the shared requests session for a REST provider."""
+        def create_session():
+            import requests
+            from requests.adapters import HTTPAdapter
+            session = requests.Session()
+            pool_size = self.pool_size(provider)
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            return session
+
+        return self._get_or_create(("session", provider), create_session)
+
+    def post(self, provider, url, **kwargs):
+        """POST through the provider's pooled session with its default timeout."""
+        kwargs.setdefault("timeout", self.timeout(provider))
+        return self.session(provider).post(url, **kwargs)
+
+    def close(self):
+        """Close every pooled client and session."""
+        with self._lock:
+            clients, self._clients = dict(self._clients), {}
+        for key, client in clients.items():
+            try:
+                if key[0].startswith("async-"):
+                    # Async clients must be closed on the loop that owns them
+                    loop = key[-1]
+                    if loop.is_running() and not loop.is_closed():
+                        closer = client.aclose() if hasattr(client, "aclose") else client.close()
+                        asyncio.run_coroutine_threadsafe(closer, loop).result(5)
+                else:
+                    client.close()
+            except Exception as e:
+                print(f"Error closing provider client: {e}")
+
+# Shared by all agents in the process
+provider_clients = ProviderClientRegistry()
@@ -0,0 +1,172 @@
+import os
+import time
+import asyncio
+import threading
+from collections import deque
+
+# (requests per minute, tokens per minute) allowed for each provider
+PROVIDER_RATE_LIMITS = {
+    "openai": (500, 10000),
+    "anthropic": (50, 40000),
+    "groq": (30, 6000),
+    "google": (60, 32000),
+    "cohere": (100, 100000),
+    "emergenceai": (60, 60000)
+}
+
+DEFAULT_RATE_LIMIT = (60, 40000)
+
+# Longest a call may queue for its provider before it is refused
+MAX_WAIT_SECONDS = float(os.getenv("IPMDAR_RATE_LIMIT_MAX_WAIT_SECONDS", "10"))
+
+def parse_rate_limits(value):
+    """Parse "provider=requests/tokens,..." (per minute) into a dict of overrides."""
+    limits = {}
+    for assignment in filter(None, (part.strip() for part in value.split(","))):
+        provider, _, rates = assignment.partition("=")
+        requests_per_minute, _, tokens_per_minute = rates.partition("/")
+        limits[provider] = (int(requests_per_minute), int(tokens_per_minute))
+    return limits
+
+class RateLimitTimeout(Exception):
+    """Raised when a call would wait longer than the limiter's max wait."""
+
+class TokenBucket:
+    """
+    Token bucket that hands out reservations.
+
+    The level may go negative: a reservation that cannot be met now takes its
+    tokens anyway and is told how long to wait for the bucket to refill. Later
+    reservations queue behind the debt, which keeps admission first in,
+    first out.
+    """
+
+    def __init__(self, capacity, refill_per_second):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.level = float(capacity)
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated_at) * self.refill_per_second)
+        self.updated_at = now
+
+    def wait_for(self, amount, now):
+        """Return the seconds until amount could be taken, without taking it."""
+        self._refill(now)
+        shortfall = min(amount, self.capacity) - self.level
+        return max(0.0, shortfall / self.refill_per_second)
+
+    def take(self, amount):
+        self.level -= min(amount, self.capacity)
+
+    def give_back(self, amount):
+        self.level = min(self.capacity, self.level + min(amount, self.capacity))
+
+class ProviderRateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute limits for one provider.
+
+    Callers reserve one request and their estimated tokens, then sleep until
+    their reservation comes due, so waiting calls are admitted in arrival
+    order. A call whose wait would exceed max_wait_seconds is refused with
+    RateLimitTimeout without reserving anything.
+    """
+
+    def __init__(self, provider, requests_per_minute, tokens_per_minute, max_wait_seconds=MAX_WAIT_SECONDS):
+        self.provider = provider
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_wait_seconds = max_wait_seconds
+        self.requests = TokenBucket(requests_per_minute, requests_per_minute / 60.0)
+        self.tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60.0)
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.total_wait_seconds = 0.0
+        self.waits = deque(maxlen=200)
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens):
+        """Reserve capacity for a call and return how long to wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            wait = max(self.requests.wait_for(1, now), self.tokens.wait_for(tokens, now))
+            if wait > self.max_wait_seconds:
+                self.rejected += 1
+                raise RateLimitTimeout(
+                    f"{self.provider} rate limit: call would wait {wait:.1f}s (max {self.max_wait_seconds:.0f}s)"
+                )
+            self.requests.take(1)
+            self.tokens.take(tokens)
+            self.admitted += 1
+            self.total_wait_seconds += wait
+            self.waits.append(wait)
+            if wait > 0:
+                self.queue_depth += 1
+                self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+            return wait
+
+    def _dequeue(self, wait, tokens=None):
+        """Leave the wait queue; tokens are returned to the buckets if the caller gave up."""
+        with self._lock:
+            if wait > 0:
+                self.queue_depth -= 1
+            if tokens is not None:
+                self.requests.give_back(1)
+                self.tokens.give_back(tokens)
+                self.admitted -= 1
+
+    def acquire(self, tokens):
+        """Block until a call using about this many tokens may be sent."""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+            self._dequeue(wait)
+
+    async def acquire_async(self, tokens):
+        """Wait, without blocking the event loop, until a call using about this many tokens may be sent."""
+        wait = self._reserve(tokens)
+        if wait <= 0:
+            return
+        try:
+            await asyncio.sleep(wait)
+        except asyncio.CancelledError:
+            self._dequeue(wait, tokens)
+            raise
+        self._dequeue(wait)
+
+    def snapshot(self):
+        """Return the limiter's configuration, queue depth and wait-time metrics."""
+        with self._lock:
+            waits = sorted(self.waits)
+            return {
+                "requests_per_minute": self.requests_per_minute,
+                "tokens_per_minute": self.tokens_per_minute,
+                "queue_depth": self.queue_depth,
+                "max_queue_depth": self.max_queue_depth,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "mean_wait_seconds": (self.total_wait_seconds / self.admitted) if self.admitted else 0.0,
+                "p95_wait_seconds": waits[int(len(waits) * 0.95)] if waits else 0.0
+            }
+
+class RateLimiterRegistry:
+    """Process-wide set of rate limiters, one per provider."""
+
+    def __init__(self, limits=None):
+        self.limits = dict(PROVIDER_RATE_LIMITS, **(limits or {}))
+        self._limiters = {}
+        self._lock = threading.Lock()
+
+    def limiter(self, provider):
+        """Return the rate limiter for a provider."""
+        with self._lock:
+            if provider not in self._limiters:
+                requests_per_minute, tokens_per_minute = self.limits.get(provider, DEFAULT_RATE_LIMIT)
+                self._limiters[provider] = ProviderRateLimiter(provider, requests_per_minute, tokens_per_minute)
+            return self._limiters[provider]
+
+# Shared by all agents in the process; IPMDAR_RATE_LIMITS overrides the defaults
+rate_limiters = RateLimiterRegistry(parse_rate_limits(os.getenv("IPMDAR_RATE_LIMITS", "")))
@@ -0,0 +1,225 @@
+import os
+import time
+import random
+import threading
+from collections import deque
+
+# Retries per provider before failing over, and the jittered exponential backoff between them
+RETRY_ATTEMPTS = int(os.getenv("IPMDAR_PROVIDER_RETRIES", "2"))
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 4.0
+
+# A provider call slower than this counts against the provider's breaker like a failure
+LATENCY_SLO_SECONDS = float(os.getenv("IPMDAR_PROVIDER_LATENCY_SLO_SECONDS", "20"))
+
+# Consecutive failures or SLO breaches that open a breaker, and how long it stays open
+FAILURE_THRESHOLD = int(os.getenv("IPMDAR_BREAKER_FAILURE_THRESHOLD", "5"))
+RESET_TIMEOUT_SECONDS = float(os.getenv("IPMDAR_BREAKER_RESET_SECONDS", "30"))
+
+# Recent successful call latencies kept per provider, and how many are needed before percentiles are trusted
+LATENCY_WINDOW = 200
+LATENCY_MIN_SAMPLES = 20
+
+# Weight of the newest call in each provider's latency and error-rate moving averages
+EWMA_ALPHA = 0.2
+
+# Hedged calls allowed per primary call, and how many unused hedges may accumulate
+HEDGE_BUDGET_RATIO = float(os.getenv("IPMDAR_HEDGE_BUDGET", "0.05"))
+HEDGE_BURST = 5
+
+def backoff_delay(attempt):
+    """Return a full-jitter exponential backoff delay for a retry attempt (0-based)."""
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+
+class CircuitBreaker:
+    """
+    Circuit breaker for one LLM provider.
+
+    Closed: calls flow normally. After failure_threshold consecutive failures
+    or latency-SLO breaches the breaker opens and the provider is skipped.
+    Once reset_timeout_seconds have passed it is half-open and lets a single
+    probe call through; a healthy probe closes it, anything else reopens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, provider, failure_threshold=FAILURE_THRESHOLD,
+                 latency_slo_seconds=LATENCY_SLO_SECONDS, reset_timeout_seconds=RESET_TIMEOUT_SECONDS):
+        self.provider = provider
+        self.failure_threshold = failure_threshold
+        self.latency_slo_seconds = latency_slo_seconds
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.probe_in_flight = False
+        self.successes = 0
+        self.failures = 0
+        self.slow_calls = 0
+        self.last_error = None
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.latency_ewma = None
+        self.error_rate_ewma = 0.0
+        self._lock = threading.Lock()
+
+    def allow_request(self):
+        """Return True if a call to the provider may go ahead now."""
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout_seconds:
+                    return False
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN:
+                if self.probe_in_flight:
+                    return False
+                self.probe_in_flight = True
+            return True
+
+    def record_success(self, latency):
+        """Record a completed call and its latency in seconds."""
+        with self._lock:
+            self.probe_in_flight = False
+            self.latencies.append(latency)
+            self._update_ewma(latency, 0.0)
+            if latency > self.latency_slo_seconds:
+                self.slow_calls += 1
+                self._record_bad_call(f"latency {latency:.1f}s over the {self.latency_slo_seconds:.0f}s SLO")
+                return
+            self.successes += 1
+            self.consecutive_failures = 0
+            self.state = self.CLOSED
+
+    def record_failure(self, error):
+        """Record a failed call."""
+        with self._lock:
+            self.probe_in_flight = False
+            self.failures += 1
+            self._update_ewma(None, 1.0)
+            self._record_bad_call(str(error) or type(error).__name__)
+
+    def release(self):
+        """Forget a call that was abandoned by the caller before it finished."""
+        with self._lock:
+            self.probe_in_flight = False
+
+    def _update_ewma(self, latency, error):
+        if latency is not None:
+            self.latency_ewma = latency if self.latency_ewma is None else (
+                EWMA_ALPHA * latency + (1 - EWMA_ALPHA) * self.latency_ewma
+            )
+        self.error_rate_ewma = EWMA_ALPHA * error + (1 - EWMA_ALPHA) * self.error_rate_ewma
+
+    def ewma(self):
+        """Return (latency EWMA in seconds or None before any success, error-rate EWMA)."""
+        with self._lock:
+            return self.latency_ewma, self.error_rate_ewma
+
+    def latency_percentile(self, percentile):
+        """Return the given percentile (0-1) of recent call latencies, or None without enough samples."""
+        with self._lock:
+            if len(self.latencies) < LATENCY_MIN_SAMPLES:
+                return None
+            latencies = sorted(self.latencies)
+        return latencies[min(len(latencies) - 1, int(len(latencies) * percentile))]
+
+    def _record_bad_call(self, reason):
+        self.last_error = reason
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                print(f"Circuit breaker for {self.provider} opened: {reason}")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def snapshot(self):
+        """Return the breaker's state and counters."""
+        with self._lock:
+            retry_in = None
+            if self.state == self.OPEN:
+                retry_in = max(0.0, self.reset_timeout_seconds - (time.monotonic() - self.opened_at))
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "successes": self.successes,
+                "failures": self.failures,
+                "slow_calls": self.slow_calls,
+                "last_error": self.last_error,
+                "retry_in_seconds": retry_in,
+                "latency_samples": len(self.latencies),
+                "latency_ewma_seconds": self.latency_ewma,
+                "error_rate_ewma": self.error_rate_ewma
+            }
+
+class ProviderHealth:
+    """Process-wide set of circuit breakers, one per provider."""
+
+    def __init__(self):
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, provider):
+        """Return the circuit breaker for a provider."""
+        with self._lock:
+            if provider not in self._breakers:
+                self._breakers[provider] = CircuitBreaker(provider)
+            return self._breakers[provider]
+
+    def is_healthy(self, provider):
+        """Return True unless the provider's breaker is open."""
+        return self.breaker(provider).snapshot()["state"] != CircuitBreaker.OPEN
+
+    def snapshot(self):
+        """Return the state of every provider's breaker."""
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {provider: breaker.snapshot() for provider, breaker in breakers.items()}
+
+class HedgeBudget:
+    """
+    Caps hedged provider calls at a fraction of primary calls.
+
+    Every primary call earns ratio of a hedge, up to burst unused hedges; a
+    hedge is only sent when a whole one has been earned.
+    """
+
+    def __init__(self, ratio=HEDGE_BUDGET_RATIO, burst=HEDGE_BURST):
+        self.ratio = ratio
+        self.burst = burst
+        self.available = 0.0
+        self.primary_calls = 0
+        self.hedges = 0
+        self.denied = 0
+        self._lock = threading.Lock()
+
+    def record_call(self):
+        """Record a primary call that could have been hedged."""
+        with self._lock:
+            self.primary_calls += 1
+            self.available = min(self.burst, self.available + self.ratio)
+
+    def try_spend(self):
+        """Take one hedge from the budget; returns False when the budget is exhausted."""
+        with self._lock:
+            if self.available < 1:
+                self.denied += 1
+                return False
+            self.available -= 1
+            self.hedges += 1
+            return True
+
+    def snapshot(self):
+        """Return the budget's counters."""
+        with self._lock:
+            return {
+                "ratio": self.ratio,
+                "primary_calls": self.primary_calls,
+                "hedges": self.hedges,
+                "denied": self.denied,
+                "available": self.available
+            }
+
+# Shared by all agents in the process
+provider_health = ProviderHealth()
+hedge_budget = HedgeBudget()
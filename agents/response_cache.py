@@ -0,0 +1,205 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+
+def normalize_query(query):
+    """Normalize a query so trivially different phrasings share a cache entry."""
+    query = re.sub(r"\s+", " ", query.strip().lower())
+    return query.rstrip(" ?!.")
+
+class MemoryCacheBackend:
+    """In-process LRU cache with a time-to-live on each entry."""
+
+    def __init__(self, max_entries=1000, ttl_seconds=86400):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if time.time() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.evictions += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def __len__(self):
+        return len(self._entries)
+
+class SQLiteCacheBackend:
+    """
+    Cache stored in a local SQLite file, shared by worker processes on the host.
+
+    Entries expire after ttl_seconds and the least recently used entries are
+    evicted once the table grows past max_entries.
+    """
+
+    def __init__(self, path, max_entries=10000, ttl_seconds=86400):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+
+    def get(self, key):
+        now = time.time()
+        with self._lock, self._connection:
+            row = self._connection.execute(
+                "SELECT value, stored_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, stored_at = row
+            if now - stored_at > self.ttl_seconds:
+                self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.evictions += 1
+                return None
+            self._connection.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        return json.loads(value)
+
+    def set(self, key, value):
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses (key, value, stored_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now)
+            )
+            overflow = self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self._connection.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY accessed_at LIMIT ?)", (overflow,)
+                )
+                self.evictions += overflow
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+class ResponseCache:
+    """
+    Cache of agent responses keyed by agent, provider, model, normalized query
+    and knowledge base version.
+
+    With a semantic index (the knowledge base's vector index) and a similarity
+    threshold, a miss can also be served by a previously cached query whose
+    embedding is close enough. The semantic lookup table lives in memory, so
+    it only covers entries cached by this process.
+    """
+
+    def __init__(self, backend, semantic_index=None, semantic_threshold=None):
+        self.backend = backend
+        self.semantic_index = semantic_index
+        self.semantic_threshold = semantic_threshold
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self._semantic_entries = {}
+        self._lock = threading.Lock()
+
+    def _scope(self, agent, provider, model, knowledge_version):
+        return f"{agent}|{provider}|{model}|{knowledge_version}"
+
+    def _key(self, scope, normalized_query):
+        return hashlib.sha256(f"{scope}|{normalized_query}".encode("utf-8")).hexdigest()
+
+    def get(self, agent, provider, model, knowledge_version, query):
+        """Return the cached response for a query, or None on a miss."""
+        scope = self._scope(agent, provider, model, knowledge_version)
+        normalized = normalize_query(query)
+        value = self.backend.get(self._key(scope, normalized))
+        if value is None and self.semantic_threshold:
+            value = self._semantic_get(scope, normalized)
+            if value is not None:
+                with self._lock:
+                    self.semantic_hits += 1
+
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, agent, provider, model, knowledge_version, query, value):
+        """Cache a response for a query."""
+        scope = self._scope(agent, provider, model, knowledge_version)
+        normalized = normalize_query(query)
+        key = self._key(scope, normalized)
+        self.backend.set(key, value)
+        if self.semantic_threshold and self.semantic_index is not None:
+            vector = self.semantic_index.embed([normalized])[0]
+            with self._lock:
+                entries = self._semantic_entries.setdefault(scope, {})
+                entries.pop(key, None)
+                entries[key] = vector
+                # Keep the semantic table no larger than the backend; oldest entries go first
+                while len(entries) > self.backend.max_entries:
+                    del entries[next(iter(entries))]
+
+    def _semantic_get(self, scope, normalized_query):
+        """Return the response cached for the most similar earlier query, if similar enough."""
+        if self.semantic_index is None:
+            return None
+        with self._lock:
+            entries = list(self._semantic_entries.get(scope, {}).items())
+        if not entries:
+            return None
+
+        # Score every cached query in the scope with one matrix-vector product
+        query_vector = self.semantic_index.embed([normalized_query])[0]
+        scores = np.vstack([vector for _, vector in entries]) @ query_vector
+        best = int(np.argmax(scores))
+        best_key = entries[best][0]
+        if scores[best] < self.semantic_threshold:
+            return None
+        value = self.backend.get(best_key)
+        if value is None:
+            # The entry expired or was evicted from the backend
+            with self._lock:
+                self._semantic_entries.get(scope, {}).pop(best_key, None)
+        return value
+
+    def stats(self):
+        """Return hit/miss metrics for the cache."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": type(self.backend).__name__,
+                "entries": len(self.backend),
+                "hits": self.hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "evictions": self.backend.evictions
+            }
@@ -6,6 +6,13 @@ class RiskForecastingAgent(BaseAgent):
     risk identification, and mitigation strategies using IPMDAR datasets.
     """
     
+    # Keywords used to pull related sentences from other knowledge categories
+    RISK_KEYWORDS = [
+        "risk", "forecast", "prediction", "mitigation", "probability", "impact",
+        "likelihood", "consequence", "uncertainty", "opportunity", "threat",
+        "contingency", "reserve", "estimate", "projection", "future"
+    ]
+    
     def __init__(self, knowledge_base):
         super().__init__(
             knowledge_base=knowledge_base,
@@ -14,6 +21,10 @@ class RiskForecastingAgent(BaseAgent):
         )
         self.knowledge_category = "risk_forecasting"
         self.llm_provider = "google"  # Using Google's API for risk forecasting agent
+        
+        # Index this agent's keywords once at load time rather than on every query
+        if "_keywords" in self.knowledge_base:
+            self.knowledge_base["_keywords"].add_keywords(self.RISK_KEYWORDS)
     
     def get_expertise_description(self):
         return """Focuses on predictive analytics, risk identification, and mitigation strategies using IPMDAR datasets.
@@ -33,38 +44,22 @@ Specializes in:
         # Get base knowledge
         knowledge = super().retrieve_relevant_knowledge(query)
         
-        # Add any risk-specific filtering or processing here
-        risk_keywords = [
-            "risk", "forecast", "prediction", "mitigation", "probability", "impact",
-            "likelihood", "consequence", "uncertainty", "opportunity", "threat",
-            "contingency", "reserve", "estimate", "projection", "future"
-        ]
-        
         # Check if query is risk-focused
         query_lower = query.lower()
-        risk_focused = any(keyword in query_lower for keyword in risk_keywords)
+        risk_focused = any(keyword.lower() in query_lower for keyword in self.RISK_KEYWORDS)
         
         if risk_focused:
-            # Add more risk-related knowledge if available
-            for category in ["data_analytics", "project_management"]:
-                if category in self.knowledge_base:
-                    # Filter for risk-related items in other categories
-                    for item in self.knowledge_base[category]:
-                        item_lower = item.lower()
-                        if any(keyword in item_lower for keyword in risk_keywords):
-                            knowledge.append(item)
+            # Add the best risk-related matches from other categories, found with the precomputed keyword postings
+            knowledge.extend(self.related_knowledge(query, self.RISK_KEYWORDS, ["data_analytics", "project_management"], exclude=knowledge))
         
         return knowledge
         
-    def generate_response(self, query, relevant_knowledge):
+    def response_suffix(self, query):
         """Override to customize response generation for risk forecasting."""
-        # Get base response
-        base_response = super().generate_response(query, relevant_knowledge)
-        
         # For risk identification queries, add specific framework
         query_lower = query.lower()
         if "identif" in query_lower and "risk" in query_lower:
             risk_framework = "\n\nStandard IPMDAR Risk Identification Framework:\n1. Review performance metrics for negative trends\n2. Analyze CPI and SPI for early warning indicators\n3. Evaluate technical performance measures against requirements\n4. Assess critical path activities for schedule risks\n5. Identify cost drivers and potential overruns\n6. Categorize identified risks by impact and probability"
-            return base_response + risk_framework
+            return risk_framework
         
-        return base_response
+        return ""
@@ -0,0 +1,61 @@
+import os
+from agents.resilience import provider_health
+
+# The home provider keeps an agent's traffic until its error-rate EWMA passes this...
+ROUTER_ERROR_THRESHOLD = float(os.getenv("IPMDAR_ROUTER_ERROR_THRESHOLD", "0.3"))
+# ...or its latency EWMA grows past this multiple of the best alternative's (and past the floor below)
+ROUTER_LATENCY_FACTOR = float(os.getenv("IPMDAR_ROUTER_LATENCY_FACTOR", "2.0"))
+ROUTER_LATENCY_FLOOR_SECONDS = 2.0
+
+# Latency assumed for a provider that has not answered yet, so untried providers rank behind proven fast ones
+UNOBSERVED_LATENCY_SECONDS = 5.0
+
+class AdaptiveRouter:
+    """
+    Orders the providers an agent may use, best first.
+
+    Providers are ranked by expected time to a good answer: their latency
+    EWMA divided by their success rate. Each agent sticks to its home
+    provider while it stays healthy; once the home provider degrades past the
+    error-rate or latency threshold the agent's calls go to the best-ranked
+    provider instead. Providers with an open circuit breaker go last.
+    """
+
+    def __init__(self, health=provider_health, error_threshold=ROUTER_ERROR_THRESHOLD,
+                 latency_factor=ROUTER_LATENCY_FACTOR, latency_floor_seconds=ROUTER_LATENCY_FLOOR_SECONDS):
+        self.health = health
+        self.error_threshold = error_threshold
+        self.latency_factor = latency_factor
+        self.latency_floor_seconds = latency_floor_seconds
+
+    def score(self, provider):
+        """Return the expected seconds to a successful answer from a provider."""
+        latency, error_rate = self.health.breaker(provider).ewma()
+        if latency is None:
+            latency = UNOBSERVED_LATENCY_SECONDS
+        return latency / max(0.05, 1.0 - error_rate)
+
+    def is_degraded(self, provider, alternatives):
+        """Return True if a provider has degraded enough to give up its sticky traffic."""
+        latency, error_rate = self.health.breaker(provider).ewma()
+        if error_rate > self.error_threshold:
+            return True
+        if latency is None or latency <= self.latency_floor_seconds:
+            # A provider answering this quickly is not degraded, whatever the alternatives manage
+            return False
+        observed = [self.health.breaker(other).ewma()[0] for other in alternatives]
+        observed = [other_latency for other_latency in observed if other_latency is not None]
+        return bool(observed) and latency > self.latency_factor * min(observed)
+
+    def route(self, home, allowed):
+        """Return the allowed providers in the order an agent with this home provider should try them."""
+        healthy = [provider for provider in allowed if self.health.is_healthy(provider)]
+        unhealthy = [provider for provider in allowed if provider not in healthy]
+        ranked = sorted(healthy, key=self.score)
+        if home in ranked and not self.is_degraded(home, [provider for provider in ranked if provider != home]):
+            ranked.remove(home)
+            ranked.insert(0, home)
+        return ranked + unhealthy
+
+# Shared by all agents in the process
+provider_router = AdaptiveRouter()
@@ -0,0 +1,95 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+
+class CallAbandoned(Exception):
+    """The leading caller gave up before it had a result, e.g. a streaming client disconnected."""
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls into one.
+
+    The first caller for a key does the work; callers arriving with the same
+    key while it is in flight wait for that result instead of repeating it.
+    Threads and coroutines share the same in-flight calls, so a query running
+    for a Flask worker thread also serves the same query arriving through the
+    event loop, and vice versa.
+
+    A leader that drives the work itself, like a streamed response, uses
+    join and settle directly. If it settles with CallAbandoned, its
+    followers join again and one of them takes over the call.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.coalesced = 0
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def join(self, key):
+        """Return (future, leader) for a key; the leader must settle the future."""
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = Future()
+            self._in_flight[key] = future
+            self.calls += 1
+            return future, True
+
+    def settle(self, key, future, result=None, error=None):
+        """Finish a leader's call, passing its result or error to the callers waiting on it."""
+        with self._lock:
+            self._in_flight.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def run(self, key, func):
+        """Call func() unless an identical call is in flight, and return its result."""
+        future, leader = self.join(key)
+        if not leader:
+            try:
+                return future.result()
+            except CallAbandoned:
+                return self.run(key, func)
+        try:
+            result = func()
+        except BaseException as e:
+            self.settle(key, future, error=e)
+            raise
+        self.settle(key, future, result=result)
+        return result
+
+    async def run_async(self, key, coroutine_function):
+        """Await coroutine_function() unless an identical call is in flight, and return its result."""
+        future, leader = self.join(key)
+        if leader:
+            # The work runs as its own task so a caller that gives up does not cancel it for the others
+            task = asyncio.ensure_future(coroutine_function())
+            task.add_done_callback(lambda done: self._settle_from_task(key, future, done))
+        try:
+            return await asyncio.shield(asyncio.wrap_future(future))
+        except CallAbandoned:
+            return await self.run_async(key, coroutine_function)
+
+    def _settle_from_task(self, key, future, task):
+        if task.cancelled():
+            self.settle(key, future, error=asyncio.CancelledError())
+        else:
+            self.settle(key, future, result=task.result() if task.exception() is None else None,
+                         error=task.exception())
+
+    def stats(self):
+        """Return how many calls ran and how many were served by another caller's call."""
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._in_flight)
+            }
+
+# Shared by all agents in the process
+in_flight_queries = SingleFlight()
@@ -47,15 +47,12 @@ Specializes in:
             
         return knowledge
         
-    def generate_response(self, query, relevant_knowledge):
+    def response_suffix(self, query):
         """Override to customize response generation for systems integration."""
-        # Get base response
-        base_response = super().generate_response(query, relevant_knowledge)
-        
         # For JSON data format queries, add specific examples
         query_lower = query.lower()
         if "json" in query_lower or "data format" in query_lower or "schema" in query_lower:
             json_example = '\n\nExample IPMDAR JSON Format:\n```json\n{\n  "header": {\n    "submissionDate": "2025-03-03",\n    "contractNumber": "FA8621-15-C-6397",\n    "contractorName": "Example Contractor Inc.",\n    "reportingPeriod": {\n      "start": "2025-02-01",\n      "end": "2025-02-28"\n    }\n  },\n  "performanceData": {\n    "contractBudgetBase": 1000000,\n    "budgetAtCompletion": 950000,\n    "actualCostOfWorkPerformed": 450000,\n    "budgetedCostOfWorkPerformed": 500000,\n    "budgetedCostOfWorkScheduled": 550000\n  },\n  "metrics": {\n    "costPerformanceIndex": 1.11,\n    "schedulePerformanceIndex": 0.91,\n    "estimateAtCompletion": 855855\n  }\n}\n```'
-            return base_response + json_example
+            return json_example
         
-        return base_response
+        return ""
@@ -1,21 +1,30 @@
-from flask import Flask, request, jsonify, render_template
+# Startup is timed from the first import; see /api/startup
+from utils.startup_report import StartupReport
+startup_report = StartupReport()
+
+from flask import Flask, request, jsonify, render_template, Response, stream_with_context
 from flask_cors import CORS
 import os
 import json
 import time
-import random
-import threading
+import queue
+from concurrent.futures import ThreadPoolExecutor, wait
 from dotenv import load_dotenv
-import openai
-import requests
 from agents.compliance_policy import ComplianceAgent
 from agents.data_analytics import DataAnalyticsAgent
 from agents.project_management import ProjectManagementAgent
 from agents.risk_forecasting import RiskForecastingAgent
 from agents.systems_integration import SystemsIntegrationAgent
 from agents.implementation_support import ImplementationSupportAgent
-from utils.pdf_processor import extract_pdf_text, create_knowledge_base
+from agents.competition import CompetitionEngine
+from agents.provider_clients import provider_clients
+from agents.resilience import provider_health, hedge_budget
+from agents.single_flight import in_flight_queries
+from agents.rate_limiter import rate_limiters
+from agents.response_cache import ResponseCache, MemoryCacheBackend, SQLiteCacheBackend
+from utils.pdf_processor import load_knowledge_base
 from ipmdar_camp import IPMDARTrainingCamp
+startup_report.mark("imports")
 
 # Load environment variables
 load_dotenv()
@@ -46,13 +55,23 @@ if not fallback_provider and available_providers:
 elif not fallback_provider:
     print("WARNING: No API providers available. Agent responses will fail.")
 
-# Initialize knowledge base
+# Worker pool used to consult several agents at once, and how long each agent gets to answer
+AGENT_POOL_SIZE = int(os.getenv("IPMDAR_AGENT_POOL_SIZE", "12"))
+AGENT_DEADLINE_SECONDS = float(os.getenv("IPMDAR_AGENT_DEADLINE_SECONDS", "45"))
+agent_executor = ThreadPoolExecutor(max_workers=AGENT_POOL_SIZE, thread_name_prefix="agent")
+
+# Competitions race the agents on the same pool under one overall deadline
+COMPETITION_DEADLINE_SECONDS = float(os.getenv("IPMDAR_COMPETITION_DEADLINE_SECONDS", "90"))
+competition_engine = CompetitionEngine(agent_executor, COMPETITION_DEADLINE_SECONDS)
+
+# Initialize knowledge base (served from the on-disk cache when the PDF is unchanged)
 pdf_path = "IPMDAR Implementation and Tailoring Guide_Stamped.pdf"
-ipmdar_text = extract_pdf_text(pdf_path)
-knowledge_base = create_knowledge_base(ipmdar_text)
+knowledge_base = load_knowledge_base(pdf_path)
+startup_report.mark("knowledge base")
 
 # Initialize IPMDAR Training Camp
 training_camp = IPMDARTrainingCamp(knowledge_base)
+startup_report.mark("training camp")
 
 # Function to check and assign provider based on availability
 def get_provider_or_fallback(preferred_provider):
@@ -93,6 +112,66 @@ print(f"- Dr. Risk & Forecasting: {risk_forecasting_agent.llm_provider}")
 print(f"- Dr. Systems Integration: {systems_integration_agent.llm_provider}")
 print(f"- Dr. Implementation Support: {implementation_support_agent.llm_provider}")
 
+startup_report.mark("agents")
+
+# Map agent names to agent instances
+agents = {
+    "compliance": compliance_agent,
+    "data_analytics": data_analytics_agent,
+    "project_management": project_management_agent,
+    "risk_forecasting": risk_forecasting_agent,
+    "systems_integration": systems_integration_agent,
+    "implementation_support": implementation_support_agent,
+    "all": None  # Special case for consulting all agents
+}
+
+# Response cache: "memory" (per process), "sqlite" (shared by workers on the host) or "off"
+RESPONSE_CACHE = os.getenv("IPMDAR_RESPONSE_CACHE", "memory")
+RESPONSE_CACHE_SIZE = int(os.getenv("IPMDAR_RESPONSE_CACHE_SIZE", "1000"))
+RESPONSE_CACHE_TTL = float(os.getenv("IPMDAR_RESPONSE_CACHE_TTL", "86400"))
+RESPONSE_CACHE_PATH = os.getenv("IPMDAR_RESPONSE_CACHE_PATH", "cache/responses.sqlite3")
+# Cosine similarity at which a cached answer to a similar query is reused; unset disables semantic lookups
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("IPMDAR_SEMANTIC_CACHE_THRESHOLD") or 0) or None
+
+response_cache = None
+if RESPONSE_CACHE == "sqlite":
+    response_cache = ResponseCache(
+        SQLiteCacheBackend(RESPONSE_CACHE_PATH, RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL),
+        knowledge_base.get("_index"), SEMANTIC_CACHE_THRESHOLD
+    )
+elif RESPONSE_CACHE == "memory":
+    response_cache = ResponseCache(
+        MemoryCacheBackend(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL),
+        knowledge_base.get("_index"), SEMANTIC_CACHE_THRESHOLD
+    )
+print(f"Response cache: {RESPONSE_CACHE}")
+
+for agent in agents.values():
+    if agent is not None:
+        agent.response_cache = response_cache
+
+# Optional per-agent provider allow-lists for the adaptive router,
+# e.g. IPMDAR_ALLOWED_PROVIDERS="compliance=openai|anthropic,project_management=groq|openai"
+for assignment in filter(None, os.getenv("IPMDAR_ALLOWED_PROVIDERS", "").split(",")):
+    agent_id, _, providers = assignment.strip().partition("=")
+    allowed = [provider for provider in providers.split("|") if provider in available_providers]
+    if agents.get(agent_id) is None or not allowed:
+        print(f"Ignoring provider allow-list '{assignment}': unknown agent or no available providers")
+        continue
+    agents[agent_id].allowed_providers = allowed
+
+# Opt-in request hedging, e.g. IPMDAR_HEDGE_PROVIDERS="compliance=anthropic,project_management=openai":
+# a slow call to the agent's provider is duplicated to the listed secondary provider
+for assignment in filter(None, os.getenv("IPMDAR_HEDGE_PROVIDERS", "").split(",")):
+    agent_id, _, hedge_provider = assignment.strip().partition("=")
+    if agents.get(agent_id) is None or hedge_provider not in available_providers:
+        print(f"Ignoring hedge assignment '{assignment}': unknown agent or unavailable provider")
+        continue
+    agents[agent_id].hedge_provider = hedge_provider
+    print(f"Hedging {agent_id} requests to {hedge_provider}")
+
+startup_report.mark("services")
+
 # Train agents if not already certified
 agent_types = {
     "compliance": "compliance_policy",
@@ -103,20 +182,16 @@ agent_types = {
     "implementation_support": "implementation_support"
 }
 
+# Training runs in the background on the training camp's worker pool (IPMDAR_TRAINING_WORKERS
+# agents at a time) so the app can serve requests, and report readiness on /readyz, while agents certify.
+# Certification assessments put the question banks to the registered agents themselves.
 for agent_id, agent_type in agent_types.items():
+    training_camp.register_agent(agent_id, agents[agent_id])
     if not training_camp.verify_agent_certification(agent_id):
-        training_camp.train_agent(agent_id, agent_type)
+        training_camp.submit_training(agent_id, agent_type)
 
-# Map agent names to agent instances
-agents = {
-    "compliance": compliance_agent,
-    "data_analytics": data_analytics_agent,
-    "project_management": project_management_agent,
-    "risk_forecasting": risk_forecasting_agent,
-    "systems_integration": systems_integration_agent,
-    "implementation_support": implementation_support_agent,
-    "all": None  # Special case for consulting all agents
-}
+startup_report.mark("training scheduled")
+startup_report.print_report()
 
 @app.route('/')
 def index():
@@ -136,38 +211,63 @@ def query():
     
     # Process query with the appropriate agent(s)
     if agent_name == "all":
-        # Collect responses from all agents
-        responses = []
-        for name, agent in agents.items():
-            if name != "all":
-                # Verify agent certification before processing query
-                if training_camp.verify_agent_certification(name):
-                    try:
-                        response = agent.process_query(user_query)
-                        responses.append({
-                            "agent": name,
-                            "response": response["response"],
-                            "accuracy": response["accuracy"],
-                            "certified": True,
-                            "provider": agent.llm_provider
-                        })
-                    except Exception as e:
-                        print(f"Error with {name} agent: {str(e)}")
-                        responses.append({
-                            "agent": name,
-                            "response": f"I apologize, but I encountered an error when generating a response. Please try again.",
-                            "accuracy": "0%",
-                            "certified": True,
-                            "provider": agent.llm_provider,
-                            "error": str(e)
-                        })
-                else:
-                    responses.append({
-                        "agent": name,
-                        "response": "This agent has not completed certification and cannot provide expert answers.",
-                        "accuracy": "0%",
-                        "certified": False
-                    })
+        # Consult all certified agents concurrently on the shared event loop; the panel waits
+        # for the slowest agent up to the deadline
+        agent_names = [name for name in agents if name != "all"]
+        responses = {}
+        futures = {}
+        for name in agent_names:
+            # Verify agent certification before processing query
+            if training_camp.verify_agent_certification(name):
+                futures[name] = provider_clients.submit(agents[name].async_agent.process_query(user_query))
+            else:
+                responses[name] = {
+                    "agent": name,
+                    "response": "This agent has not completed certification and cannot provide expert answers.",
+                    "accuracy": "0%",
+                    "certified": False
+                }
+        
+        done, _ = wait(futures.values(), timeout=AGENT_DEADLINE_SECONDS)
+        for name, future in futures.items():
+            agent = agents[name]
+            if future not in done:
+                # Return the partial panel rather than holding the request for a slow provider
+                future.cancel()
+                print(f"{name} agent did not respond within {AGENT_DEADLINE_SECONDS}s")
+                responses[name] = {
+                    "agent": name,
+                    "response": "This agent did not respond in time. Please try again or ask this agent directly.",
+                    "accuracy": "0%",
+                    "certified": True,
+                    "provider": agent.llm_provider,
+                    "timed_out": True
+                }
+                continue
+            try:
+                response = future.result()
+                responses[name] = {
+                    "agent": name,
+                    "response": response["response"],
+                    "accuracy": response["accuracy"],
+                    "certified": True,
+                    "provider": response.get("provider", agent.llm_provider),
+                    "hedge": response.get("hedge"),
+                    "prompt_budget": response.get("prompt_budget")
+                }
+            except Exception as e:
+                print(f"Error with {name} agent: {str(e)}")
+                responses[name] = {
+                    "agent": name,
+                    "response": f"I apologize, but I encountered an error when generating a response. Please try again.",
+                    "accuracy": "0%",
+                    "certified": True,
+                    "provider": agent.llm_provider,
+                    "error": str(e)
+                }
+        
+        # Keep the panel in a stable order regardless of which agent finished first
+        responses = [responses[name] for name in agent_names]
         return jsonify({"responses": responses})
     else:
         # Process with single agent
@@ -176,7 +276,7 @@ def query():
             try:
                 response = agent.process_query(user_query)
                 response["certified"] = True
-                response["provider"] = agent.llm_provider
+                response.setdefault("provider", agent.llm_provider)
                 return jsonify(response)
             except Exception as e:
                 print(f"Error with {agent_name} agent: {str(e)}")
@@ -195,6 +295,105 @@ def query():
                 "certified": False
             })
 
+def sse_event(event, data):
+    """Format one Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.route('/api/query/stream', methods=['POST'])
+def query_stream():
+    """
+    Streams agent responses as Server-Sent Events.
+    
+    Emits "token" events ({agent, text}) as each agent generates its answer, a
+    "done" event per agent with the same fields /api/query returns, and a
+    final "end" event. With agent "all" the certified agents stream concurrently.
+    """
+    data = request.json
+    user_query = data.get('query', '')
+    agent_name = data.get('agent', 'all')
+    
+    if not user_query:
+        return jsonify({"error": "No query provided"}), 400
+    
+    if agent_name not in agents:
+        return jsonify({"error": f"Agent '{agent_name}' not found"}), 404
+    
+    agent_names = [name for name in agents if name != "all"] if agent_name == "all" else [agent_name]
+    
+    def run_agent(name, events):
+        # Forward this agent's stream into the shared queue; None marks the end of the stream
+        try:
+            for event in agents[name].process_query_stream(user_query):
+                events.put((name, event))
+        except Exception as e:
+            print(f"Error with {name} agent: {str(e)}")
+            events.put((name, {"type": "error", "error": str(e)}))
+        finally:
+            events.put((name, None))
+    
+    def generate():
+        events = queue.Queue()
+        streaming = set()
+        for name in agent_names:
+            if training_camp.verify_agent_certification(name):
+                agent_executor.submit(run_agent, name, events)
+                streaming.add(name)
+            else:
+                yield sse_event("done", {
+                    "agent": name,
+                    "response": "This agent has not completed certification and cannot provide expert answers.",
+                    "accuracy": "0%",
+                    "certified": False
+                })
+        
+        deadline = time.monotonic() + AGENT_DEADLINE_SECONDS
+        while streaming:
+            try:
+                name, event = events.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if event is None:
+                streaming.discard(name)
+            elif event["type"] == "token":
+                yield sse_event("token", {"agent": name, "text": event["text"]})
+            elif event["type"] == "done":
+                yield sse_event("done", {
+                    "agent": name,
+                    "response": event["response"],
+                    "accuracy": event["accuracy"],
+                    "certified": True,
+                    "provider": event.get("provider", agents[name].llm_provider),
+                    "prompt_budget": event.get("prompt_budget")
+                })
+            else:
+                yield sse_event("done", {
+                    "agent": name,
+                    "response": "I apologize, but I encountered an error when generating a response. Please try again.",
+                    "accuracy": "0%",
+                    "certified": True,
+                    "provider": agents[name].llm_provider,
+                    "error": event["error"]
+                })
+        
+        # Agents still streaming at the deadline are reported as timed out
+        for name in agent_names:
+            if name in streaming:
+                yield sse_event("done", {
+                    "agent": name,
+                    "response": "This agent did not respond in time. Please try again or ask this agent directly.",
+                    "accuracy": "0%",
+                    "certified": True,
+                    "provider": agents[name].llm_provider,
+                    "timed_out": True
+                })
+        yield sse_event("end", {})
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.route('/api/compete', methods=['POST'])
 def compete():
     """
@@ -207,84 +406,70 @@ def compete():
     if not user_query:
         return jsonify({"error": "No query provided"}), 400
     
-    # Function to simulate agent competition with randomized response times
-    def agent_competition():
-        agent_results = {}
-        finish_times = {}
-        for name, agent in agents.items():
-            if name != "all":
-                # Only include certified agents
-                if training_camp.verify_agent_certification(name):
-                    # Random response time between 1-5 seconds to simulate different processing speeds
-                    response_time = random.uniform(1, 5)
-                    # Actual response generation
-                    try:
-                        response = agent.process_query(user_query)
-                        
-                        # Store both the response and the simulated finish time
-                        agent_results[name] = response
-                        finish_times[name] = response_time
-                    except Exception as e:
-                        print(f"Error with {name} agent in competition: {str(e)}")
-                        # Skip this agent in the competition
-                        continue
-        
-        # Determine winner (fastest response)
-        if finish_times:
-            winner = min(finish_times, key=finish_times.get)
-            winning_time = finish_times[winner]
-            winning_response = agent_results[winner]
-            
-            # Have other agents analyze the winning response
-            analyses = {}
-            corrections = {}
-            
-            for name, agent in agents.items():
-                if name != "all" and name != winner:
-                    # Each agent analyzes the winning response
-                    try:
-                        analysis_prompt = f"The following is a response to the query: '{user_query}'. Please analyze it for accuracy and provide feedback: {winning_response['response']}"
-                        analysis = agent.process_query(analysis_prompt)
-                        analyses[name] = analysis["response"]
-                        
-                        # Determine if correction is needed based on keywords in the analysis
-                        correction_indicators = ["incorrect", "inaccurate", "error", "mistake", "wrong", "false"]
-                        if any(indicator in analysis["response"].lower() for indicator in correction_indicators):
-                            # Agent proposes a correction
-                            correction_prompt = f"The following response to '{user_query}' contains inaccuracies. Please provide a corrected response: {winning_response['response']}"
-                            correction = agent.process_query(correction_prompt)
-                            # Random correction time between 1-3 seconds
-                            correction_time = random.uniform(1, 3)
-                            corrections[name] = {
-                                "response": correction["response"],
-                                "time": correction_time
-                            }
-                    except Exception as e:
-                        print(f"Error with {name} agent during analysis: {str(e)}")
-                        analyses[name] = f"I apologize, but I encountered an error when analyzing the response. Please try again."
-            
-            # Determine if there's a correction winner
-            correction_winner = None
-            correction_response = None
-            if corrections:
-                correction_winner = min(corrections, key=lambda x: corrections[x]["time"])
-                correction_response = corrections[correction_winner]["response"]
-            
-            return {
-                "winner": winner,
-                "winning_time": winning_time,
-                "winning_response": winning_response["response"],
-                "winning_provider": agents[winner].llm_provider,
-                "analyses": analyses,
-                "correction_needed": bool(corrections),
-                "correction_winner": correction_winner,
-                "correction_response": correction_response
-            }
-        else:
-            return {"error": "No certified agents available to compete"}
+    # Only certified agents compete
+    competitors = {
+        name: agent for name, agent in agents.items()
+        if name != "all" and training_camp.verify_agent_certification(name)
+    }
+    if not competitors:
+        return jsonify({"error": "No certified agents available to compete"})
     
     # Run the competition
-    return jsonify(agent_competition())
+    return jsonify(competition_engine.run(user_query, competitors))
+
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    """Get response cache hit/miss statistics and how many queries were coalesced in flight."""
+    if response_cache is None:
+        return jsonify({"enabled": False, "single_flight": in_flight_queries.stats()})
+    return jsonify(dict(response_cache.stats(), enabled=True, single_flight=in_flight_queries.stats()))
+
+@app.route('/api/providers/health', methods=['GET'])
+def provider_health_status():
+    """Get each LLM provider's health and rate limiter metrics, each agent's provider route, and the hedging budget."""
+    providers = {}
+    for provider, key in api_keys.items():
+        providers[provider] = dict(
+            provider_health.breaker(provider).snapshot(),
+            configured=bool(key),
+            rate_limit=rate_limiters.limiter(provider).snapshot()
+        )
+    routes = {agent_id: agent.provider_candidates() for agent_id, agent in agents.items() if agent is not None}
+    return jsonify({"providers": providers, "routes": routes, "hedging": hedge_budget.snapshot()})
+
+@app.route('/healthz', methods=['GET'])
+def healthz():
+    """Liveness: the process is up and serving requests, whether or not agents are trained."""
+    return jsonify({
+        "status": "ok",
+        "uptime_seconds": round(time.perf_counter() - startup_report.started_at, 1),
+        "startup_seconds": round(startup_report.total_seconds, 4)
+    })
+
+@app.route('/readyz', methods=['GET'])
+def readyz():
+    """
+    Readiness: 503 while any agent (or just ?agent=<id>) is still queued or training, so load
+    balancers can route around a booting worker; 200 once training has settled. Agents that
+    failed or are waiting to retry certification settle too: they fail the same way on every
+    worker, so taking the worker out of rotation would not help. Per-agent states are in the body.
+    """
+    agent_id = request.args.get('agent')
+    if agent_id is not None and agent_id not in agent_types:
+        return jsonify({"error": f"Agent '{agent_id}' not found"}), 404
+
+    readiness = {name: training_camp.get_training_state(name) for name in ([agent_id] if agent_id else agent_types)}
+    ready = not any(state in ("queued", "training") for state in readiness.values())
+    return jsonify({
+        "ready": ready,
+        "certified": all(state == "ready" for state in readiness.values()),
+        "agents": readiness
+    }), 200 if ready else 503
+
+@app.route('/api/startup', methods=['GET'])
+def startup_timings():
+    """Get the startup time breakdown of this process."""
+    return jsonify(startup_report.as_dict())
 
 @app.route('/api/agents', methods=['GET'])
 def get_agents():
@@ -313,7 +498,9 @@ def get_training_status():
     for agent_id in agent_types.keys():
         status[agent_id] = {
             "certified": training_camp.verify_agent_certification(agent_id),
-            "score": training_camp.get_agent_certification_score(agent_id)
+            "readiness": training_camp.get_training_state(agent_id),
+            "score": (training_camp.get_certification_details(agent_id) or {}).get("final_score"),
+            "progress": training_camp.get_training_progress(agent_id)
         }
     return jsonify(status)
 
@@ -325,17 +512,12 @@ def train_agent(agent_id):
     if agent_id not in agent_types:
         return jsonify({"error": f"Agent '{agent_id}' not found"}), 404
     
-    # Run training in a background thread to not block the request
-    def background_training():
-        print(f"Starting training for {agent_id} agent...")
-        training_camp.train_agent(agent_id, agent_types[agent_id])
-        print(f"Training completed for {agent_id} agent.")
-    
-    thread = threading.Thread(target=background_training)
-    thread.start()
+    # Training runs on the training camp's worker pool so the request does not block
+    training_camp.submit_training(agent_id, agent_types[agent_id])
     
     return jsonify({
-        "message": f"Training started for {agent_id} agent. Check the /api/training/status endpoint for progress."
+        "message": f"Training started for {agent_id} agent. Check the /api/training/status endpoint for progress.",
+        "readiness": training_camp.get_training_state(agent_id)
     })
 
 if __name__ == '__main__':
@@ -0,0 +1,276 @@
+import os
+import json
+import time
+import logging
+import threading
+import numpy as np
+
+from agents.provider_clients import provider_clients
+
+logger = logging.getLogger("IPMDAR Adaptive Testing")
+
+# Logistic scaling constant that makes the 2PL curve match the normal ogive
+D = 1.7
+
+# Ability grid for the posterior, and the standard deviation of its normal prior; a narrower prior
+# shrinks early estimates towards 0 and would stop tests on the strength of the prior alone
+ABILITY_GRID = np.linspace(-5.0, 5.0, 201)
+ABILITY_PRIOR_SD = 2.0
+ABILITY_PRIOR = np.exp(-0.5 * (ABILITY_GRID / ABILITY_PRIOR_SD) ** 2)
+
+# The ability's confidence bound on the far side of the cut score must clear it at
+# this one-sided confidence (95%) for the test to stop early
+CONFIDENCE_Z = float(os.getenv("IPMDAR_ADAPTIVE_CONFIDENCE_Z", "1.645"))
+
+# Questions asked before the test may stop
+MIN_ADAPTIVE_ITEMS = 3
+
+# A graded answer at or above this score counts as correct for the item model
+CORRECT_SCORE = 0.5
+
+# Parameters of uncalibrated items: discrimination 1, difficulty from the question's label
+DEFAULT_DISCRIMINATION = 1.0
+DIFFICULTY_LABELS = {"beginner": -1.0, "basic": -1.0, "intermediate": 0.0, "advanced": 1.0, "expert": 1.5}
+
+# Responses an item needs before it is calibrated, responses kept per item, and
+# the pull of the calibration towards the default parameters
+MIN_CALIBRATION_RESPONSES = 5
+MAX_ITEM_RESPONSES = 500
+CALIBRATION_PRIOR_WEIGHT = 1.0
+
+def item_key(question):
+    """Identify a question across sessions by its assessment and question ID."""
+    return f"{question['assessment']}/{question['id']}"
+
+def probability(ability, discrimination, difficulty):
+    """Two-parameter logistic probability of a correct answer."""
+    return 1.0 / (1.0 + np.exp(-D * discrimination * (ability - difficulty)))
+
+def information(ability, discrimination, difficulty):
+    """Fisher information an item gives about ability."""
+    p = probability(ability, discrimination, difficulty)
+    return (D * discrimination) ** 2 * p * (1.0 - p)
+
+def estimate_ability(responses):
+    """
+    Expected a posteriori ability estimate.
+
+    Args:
+        responses: List of (discrimination, difficulty, correct) tuples
+
+    Returns:
+        tuple: (ability, standard error) from the posterior mean and deviation
+    """
+    posterior = ABILITY_PRIOR.copy()
+    for discrimination, difficulty, correct in responses:
+        p = probability(ABILITY_GRID, discrimination, difficulty)
+        posterior *= p if correct else 1.0 - p
+    posterior /= posterior.sum()
+    ability = float((ABILITY_GRID * posterior).sum())
+    return ability, float(np.sqrt(((ABILITY_GRID - ability) ** 2 * posterior).sum()))
+
+def cut_ability(item_parameters, passing_score):
+    """Return the ability whose expected score over the items equals the passing score."""
+    expected = np.mean([probability(ABILITY_GRID, a, b) for a, b in item_parameters], axis=0)
+    above = np.nonzero(expected >= passing_score)[0]
+    return float(ABILITY_GRID[above[0]]) if len(above) else float(ABILITY_GRID[-1])
+
+class ItemCalibration:
+    """
+    Item parameters for the question banks, calibrated from past results.
+
+    Every graded answer is stored with the answering agent's ability estimate
+    for that session. An item with enough responses is calibrated by a
+    logistic regression of correctness on ability, regularized towards the
+    default parameters; other items keep the defaults. Responses and
+    parameters live in one JSON file next to certification_records.json.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.responses = {}
+        self.items = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """Load stored responses and item parameters if available."""
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r') as f:
+                    data = json.load(f)
+                self.responses = data.get('responses', {})
+                self.items = data.get('items', {})
+                logger.info(f"Loaded calibration for {len(self.items)} assessment items")
+        except Exception as e:
+            logger.error(f"Error loading item calibration: {e}")
+
+    def save(self):
+        """Save responses and item parameters to persistent storage, replacing the file atomically."""
+        try:
+            with self._lock:
+                # Write a per-process temp file first, so neither a crash nor another worker process can leave a partial file
+                temporary_path = f"{self.path}.{os.getpid()}.tmp"
+                with open(temporary_path, 'w') as f:
+                    json.dump({'items': self.items, 'responses': self.responses}, f, indent=2)
+                os.replace(temporary_path, self.path)
+        except Exception as e:
+            logger.error(f"Error saving item calibration: {e}")
+
+    def parameters(self, question):
+        """Return (discrimination, difficulty) for a question."""
+        with self._lock:
+            item = self.items.get(item_key(question))
+        if item is not None:
+            return item['discrimination'], item['difficulty']
+        return DEFAULT_DISCRIMINATION, self.default_difficulty(question)
+
+    @staticmethod
+    def default_difficulty(question):
+        return DIFFICULTY_LABELS.get(str(question.get('difficulty', '')).lower(), 0.0)
+
+    def record_session(self, agent_id, questions, results):
+        """
+        Store one assessment's graded answers and recalibrate the items they touched.
+
+        Args:
+            agent_id: Agent that was assessed
+            questions: The questions that could have been asked
+            results: Per-question results from the assessment engine
+
+        Returns:
+            float: The session's ability estimate under the parameters before recalibration
+        """
+        by_key = {item_key(question): question for question in questions}
+        answered = [(item_key(result), result['score'] >= CORRECT_SCORE) for result in results
+                    if not result.get('error') and item_key(result) in by_key]
+        ability, _ = estimate_ability([(*self.parameters(by_key[key]), correct) for key, correct in answered])
+
+        with self._lock:
+            for key, correct in answered:
+                item_responses = self.responses.setdefault(key, [])
+                item_responses.append({'agent_id': agent_id, 'ability': ability, 'correct': correct})
+                del item_responses[:-MAX_ITEM_RESPONSES]
+                if len(item_responses) >= MIN_CALIBRATION_RESPONSES:
+                    self.items[key] = self._calibrate(item_responses, self.default_difficulty(by_key[key]))
+        self.save()
+        return ability
+
+    @staticmethod
+    def _calibrate(item_responses, prior_difficulty):
+        """Fit an item's 2PL parameters to (ability, correct) responses with Newton's method."""
+        abilities = np.array([response['ability'] for response in item_responses])
+        correct = np.array([response['correct'] for response in item_responses], dtype=float)
+        design = np.column_stack([abilities, np.ones_like(abilities)])
+
+        # Logit = slope * ability + intercept, with slope = D * a and intercept = -D * a * b
+        prior = np.array([D * DEFAULT_DISCRIMINATION, -D * DEFAULT_DISCRIMINATION * prior_difficulty])
+        weights = prior.copy()
+        for _ in range(25):
+            p = 1.0 / (1.0 + np.exp(-design @ weights))
+            gradient = design.T @ (correct - p) - CALIBRATION_PRIOR_WEIGHT * (weights - prior)
+            hessian = design.T @ (design * (p * (1 - p))[:, None]) + CALIBRATION_PRIOR_WEIGHT * np.eye(2)
+            step = np.linalg.solve(hessian, gradient)
+            weights += step
+            if np.abs(step).max() < 1e-6:
+                break
+
+        discrimination = float(np.clip(weights[0] / D, 0.2, 3.0))
+        return {
+            'discrimination': discrimination,
+            'difficulty': float(np.clip(-weights[1] / (D * discrimination), -5.0, 5.0)),
+            'responses': len(item_responses)
+        }
+
+    def snapshot(self):
+        """Return the calibrated items' parameters."""
+        with self._lock:
+            return {key: dict(item) for key, item in self.items.items()}
+
+class AdaptiveAssessment:
+    """
+    Computerized adaptive certification test over an agent's question banks.
+
+    Each step asks the unasked question with the most Fisher information at
+    the current ability estimate, then re-estimates ability. The test stops
+    as soon as the ability's confidence bound clears the cut ability (the
+    ability at which the expected score over the whole bank is the passing
+    score) or the remaining questions can no longer change the outcome, so a
+    clear pass or fail is reached with a fraction of the questions. If the
+    bank runs out first, the point estimate decides. Questions the providers
+    could not answer are skipped: they neither move the estimate nor count
+    towards the minimum number of items.
+    """
+
+    def __init__(self, engine, calibration, min_items=MIN_ADAPTIVE_ITEMS):
+        self.engine = engine
+        self.calibration = calibration
+        self.min_items = min_items
+
+    @staticmethod
+    def _decided(responses, remaining_parameters, cut):
+        """True when no answers to the remaining questions could change the final pass/fail decision."""
+        if not remaining_parameters:
+            return False
+        all_wrong, _ = estimate_ability(responses + [(a, b, False) for a, b in remaining_parameters])
+        all_right, _ = estimate_ability(responses + [(a, b, True) for a, b in remaining_parameters])
+        return all_wrong >= cut or all_right < cut
+
+    def assess(self, agent, questions, passing_score):
+        """
+        Adaptively assess an agent against a passing score.
+
+        Args:
+            agent: BaseAgent to assess
+            questions: Questions from BaseTrainingModule.get_certification_questions
+            passing_score: Expected score over the bank needed to pass (0-1)
+
+        Returns:
+            dict: The assessment engine's result fields plus ability, standard_error,
+            cut_ability and stopped_early; score is the expected score over the whole bank
+            and answered counts the questions asked that the providers answered
+        """
+        return provider_clients.run(self._assess_async(agent, questions, passing_score))
+
+    async def _assess_async(self, agent, questions, passing_score):
+        started = time.perf_counter()
+        parameters = [self.calibration.parameters(question) for question in questions]
+        cut = cut_ability(parameters, passing_score)
+
+        stats = {'provider_calls': 0, 'failed_calls': 0}
+        remaining = list(range(len(questions)))
+        responses, results = [], []
+        ability, standard_error = estimate_ability([])
+        while remaining:
+            # Ask the unasked question that is most informative at the current estimate
+            index = max(remaining, key=lambda i: information(ability, *parameters[i]))
+            remaining.remove(index)
+            result = (await self.engine.ask_question(agent, questions[index], stats))[0]
+            results.append(result)
+            if result.get('error'):
+                continue
+            responses.append((*parameters[index], result['score'] >= CORRECT_SCORE))
+            ability, standard_error = estimate_ability(responses)
+
+            if len(responses) >= self.min_items and (
+                ability - CONFIDENCE_Z * standard_error > cut or ability + CONFIDENCE_Z * standard_error < cut
+                or self._decided(responses, [parameters[i] for i in remaining], cut)
+            ):
+                break
+
+        return {
+            'score': float(np.mean([probability(ability, a, b) for a, b in parameters])) if parameters else 0.0,
+            'assessment_scores': self.engine.assessment_scores([result for result in results if not result.get('error')]),
+            'questions': results,
+            'answered': len(responses),
+            'batched': False,
+            'provider_calls': stats['provider_calls'],
+            'failed_calls': stats['failed_calls'],
+            'prompt_tokens': sum(result['prompt_tokens'] for result in results),
+            'completion_tokens': sum(result['completion_tokens'] for result in results),
+            'elapsed_seconds': time.perf_counter() - started,
+            'ability': ability,
+            'standard_error': standard_error,
+            'cut_ability': cut,
+            'stopped_early': len(results) < len(questions)
+        }
@@ -0,0 +1,314 @@
+import os
+import re
+import time
+import asyncio
+
+from agents.base_agent import ERROR_RESPONSE, PROVIDER_MODELS
+from agents.prompt_assembler import PromptAssembler, estimate_tokens
+from agents.provider_clients import provider_clients
+from .free_text_grader import FreeTextGrader
+
+# Provider calls made for one agent's assessment at the same time
+ASSESSMENT_CONCURRENCY = int(os.getenv("IPMDAR_ASSESSMENT_CONCURRENCY", "4"))
+
+# Multiple-choice questions are packed several to a prompt unless IPMDAR_ASSESSMENT_BATCHING=off
+ASSESSMENT_BATCHING = os.getenv("IPMDAR_ASSESSMENT_BATCHING", "on") != "off"
+
+# Share of a prompt's token budget a batch's questions may take; the rest is left for retrieved knowledge
+BATCH_QUESTION_SHARE = 0.5
+MAX_BATCH_SIZE = 20
+
+OPTION_LETTERS = "ABCDEFGH"
+
+# "B", "(B)", "B.", "**B**", "Answer: B" on the first line of a reply, but not the article in "A program..."
+ANSWER_LETTER_PATTERN = re.compile(r"^\W*(?i:(?:the )?(?:correct )?(?:answer|option)(?: is)?\W*)?\(?([A-H])(?:[).:*\-]|\s*$)")
+
+# One line of a batched reply's answer vector: "3: B", "3. (B)", "Question 3 - B"
+ANSWER_VECTOR_PATTERN = re.compile(r"^\W*(?i:question\s*)?(\d+)\s*[:.)\-]\s*\**\(?([A-H])(?:[).:*\-]|\s*$)", re.MULTILINE)
+
+BATCH_INSTRUCTIONS = (
+    "Reply with exactly one line per question, in order, in the form \"<question number>: <option letter>\" "
+    "(for example \"1: B\"), and nothing else."
+)
+
+# Free-text questions otherwise go out with the agent's usual request for a comprehensive response;
+# the grader credits the reference's content and figures, which a short answer states most plainly
+FREE_TEXT_INSTRUCTIONS = (
+    "Answer concisely, in at most a short paragraph: name the specific documents, terms and steps that apply, "
+    "and show any figures you calculate."
+)
+
+def normalize_answer(text):
+    """Lowercase, collapse whitespace and strip surrounding punctuation for exact matching."""
+    return " ".join(text.lower().split()).strip(" .'\"")
+
+class AssessmentEngine:
+    """
+    Grades an agent on its training module's question banks.
+
+    Every question goes to the real agent: its knowledge is retrieved and the
+    prompt answered through the provider failover path, with up to
+    max_concurrency provider calls in flight on the shared event loop.
+    Multiple-choice answers score 1 when the chosen option exactly matches
+    the correct one; free-text answers are scored against their reference
+    answers by FreeTextGrader, all of an assessment's answers in one batch.
+    A question the providers could not answer (ERROR_RESPONSE) is marked as
+    an error and left out of the scores, since it says nothing about the
+    agent's knowledge; callers decide whether enough questions were answered.
+
+    In batched mode multiple-choice questions are packed into one prompt per
+    batch and the reply is parsed as an answer vector ("1: B" per line); any
+    question missing from the vector is asked again on its own. A batch the
+    providers failed to answer marks all of its questions as errors instead,
+    since asking them one by one would repeat the failed call many times. Batches are
+    sized to fit the smallest context window among the agent's candidate
+    providers, so a failover cannot overflow the prompt.
+    """
+
+    def __init__(self, max_concurrency=ASSESSMENT_CONCURRENCY, batched=ASSESSMENT_BATCHING):
+        self.max_concurrency = max_concurrency
+        self.batched = batched
+
+    def assess(self, agent, questions, batched=None):
+        """
+        Put the questions to an agent and grade its answers.
+
+        Args:
+            agent: BaseAgent to assess
+            questions: Questions from BaseTrainingModule.get_certification_questions
+            batched: Override the engine's batching mode for this assessment
+
+        Returns:
+            dict: Overall score and per-assessment scores over the answered questions,
+            per-question results, the number of questions answered and totals
+        """
+        batched = self.batched if batched is None else batched
+        started = time.perf_counter()
+        stats = {'provider_calls': 0, 'failed_calls': 0}
+        results = provider_clients.run(self._assess_async(agent, questions, batched, stats))
+        answered = [result for result in results if not result.get('error')]
+
+        return {
+            'score': sum(result['score'] for result in answered) / len(answered) if answered else 0.0,
+            'assessment_scores': self.assessment_scores(answered),
+            'questions': results,
+            'answered': len(answered),
+            'batched': batched,
+            'provider_calls': stats['provider_calls'],
+            'failed_calls': stats['failed_calls'],
+            'prompt_tokens': sum(result['prompt_tokens'] for result in results),
+            'completion_tokens': sum(result['completion_tokens'] for result in results),
+            'elapsed_seconds': time.perf_counter() - started
+        }
+
+    async def _assess_async(self, agent, questions, batched, stats):
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def bounded(coroutine_function, *args, **kwargs):
+            async with semaphore:
+                return await coroutine_function(agent, *args, stats, **kwargs)
+
+        batchable = [question for question in questions if batched and question.get('options')]
+        jobs = [bounded(self._ask_batch, batch) for batch in self.plan_batches(agent, batchable)]
+        jobs.extend(bounded(self.ask_question, question, grade_free_text=False)
+                    for question in questions if not (batched and question.get('options')))
+
+        results = []
+        for job_results in await asyncio.gather(*jobs):
+            results.extend(job_results)
+
+        # Grade every free-text answer together once they are all in
+        ungraded = [result for result in results if 'answer' in result]
+        by_key = {(question['assessment'], question['id']): question for question in questions}
+        references = [by_key[(result['assessment'], result['id'])] for result in ungraded]
+        grades = self.free_text_grader(agent).grade_batch(
+            [result.pop('answer') for result in ungraded],
+            [question['answer'] for question in references],
+            [question['question'] for question in references]
+        )
+        for result, grade in zip(ungraded, grades):
+            result.update(grade)
+        return results
+
+    @staticmethod
+    def assessment_scores(results):
+        """Average score per assessment of the given question results."""
+        by_assessment = {}
+        for result in results:
+            by_assessment.setdefault(result['assessment'], []).append(result['score'])
+        return {assessment_id: sum(scores) / len(scores) for assessment_id, scores in by_assessment.items()}
+
+    @staticmethod
+    def objective_score(results):
+        """
+        Average score of the answered questions not graded on wording alone, or None if there are none.
+
+        Multiple-choice answers and free-text answers with key figures count;
+        a free-text answer without key figures is scored by FreeTextGrader's
+        wording recall only.
+        """
+        scores = [
+            result['score'] for result in results
+            if not result.get('error') and (result['type'] == 'multiple_choice' or result.get('key_figures'))
+        ]
+        return sum(scores) / len(scores) if scores else None
+
+    @staticmethod
+    def free_text_grader(agent):
+        """Grader that vectorizes answers with the agent's knowledge base index."""
+        return FreeTextGrader(agent.knowledge_base["_index"])
+
+    def batch_question_budget(self, agent):
+        """Tokens a batch's questions may use in the agent's smallest candidate context window."""
+        input_budget = min(
+            PromptAssembler(PROVIDER_MODELS.get(provider, provider)).input_budget
+            for provider in agent.provider_candidates()
+        )
+        overhead = estimate_tokens(agent.build_prompt(BATCH_INSTRUCTIONS, [])) + estimate_tokens(agent.system_prompt())
+        return int(input_budget * BATCH_QUESTION_SHARE) - overhead
+
+    def plan_batches(self, agent, questions):
+        """Split multiple-choice questions into batches that fit the agent's context window."""
+        if not questions:
+            return []
+        budget = self.batch_question_budget(agent)
+        batches, batch, used = [], [], 0
+        for question in questions:
+            cost = estimate_tokens(self.format_question(question, number=len(batch) + 1))
+            if batch and (used + cost > budget or len(batch) == MAX_BATCH_SIZE):
+                batches.append(batch)
+                batch, used = [], 0
+                cost = estimate_tokens(self.format_question(question, number=1))
+            batch.append(question)
+            used += cost
+        batches.append(batch)
+        return batches
+
+    async def _call(self, agent, prompt, knowledge_query, stats):
+        """
+        Answer a prompt as the agent; returns (answer, provider, latency, prompt tokens).
+        
+        stats['provider_calls'] counts calls a provider answered and stats['failed_calls']
+        those that ended in ERROR_RESPONSE, such as calls refused by the rate limiter.
+        """
+        relevant_knowledge = agent.retrieve_relevant_knowledge(knowledge_query)
+        started = time.perf_counter()
+        answer, prompt_budget, provider, _ = await agent.async_agent.answer(prompt, relevant_knowledge)
+        stats['failed_calls' if answer == ERROR_RESPONSE else 'provider_calls'] += 1
+        prompt_tokens = prompt_budget['prompt_tokens'] if prompt_budget else estimate_tokens(prompt)
+        return answer, provider, time.perf_counter() - started, prompt_tokens
+
+    async def ask_question(self, agent, question, stats, grade_free_text=True):
+        """
+        Put one question to the agent and grade the answer.
+
+        Returns a one-item list of the question's result; stats counts the call
+        (see _call). With grade_free_text False a free-text answer is left
+        ungraded, under the result's 'answer' key, for grading in a batch.
+        """
+        options = question.get('options')
+        answer, provider, latency, prompt_tokens = await self._call(
+            agent, self.format_question(question), question['question'], stats
+        )
+        result = {
+            'assessment': question['assessment'],
+            'id': question['id'],
+            'type': 'multiple_choice' if options else 'free_text',
+            'provider': provider,
+            'latency_seconds': latency,
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': estimate_tokens(answer),
+            'batch_size': 1
+        }
+        if answer == ERROR_RESPONSE:
+            result.update(score=0.0, error=True)
+        elif options:
+            result.update(self.grade_choice(question, self.chosen_option(answer, options)))
+        elif grade_free_text:
+            result.update(self.free_text_grader(agent).grade(answer, question['answer'], question['question']))
+        else:
+            result['answer'] = answer
+        return [result]
+
+    async def _ask_batch(self, agent, questions, stats):
+        """Put a batch of multiple-choice questions to the agent in one prompt and grade the answer vector."""
+        if len(questions) == 1:
+            return await self.ask_question(agent, questions[0], stats)
+
+        prompt = self.format_batch(questions)
+        answer, provider, latency, prompt_tokens = await self._call(
+            agent, prompt, " ".join(question['question'] for question in questions), stats
+        )
+        failed = answer == ERROR_RESPONSE
+        letters = {} if failed else self.parse_answer_vector(answer, len(questions))
+
+        results = []
+        for number, question in enumerate(questions, 1):
+            letter = letters.get(number)
+            if not failed and (letter is None or OPTION_LETTERS.index(letter) >= len(question['options'])):
+                # Missing from the answer vector: ask this question on its own
+                results.extend(await self.ask_question(agent, question, stats))
+                continue
+            result = {
+                'assessment': question['assessment'],
+                'id': question['id'],
+                'type': 'multiple_choice',
+                'provider': provider,
+                'latency_seconds': latency,
+                # The batch's tokens are shared evenly among its questions
+                'prompt_tokens': prompt_tokens // len(questions),
+                'completion_tokens': estimate_tokens(answer) // len(questions),
+                'batch_size': len(questions)
+            }
+            if failed:
+                result.update(score=0.0, error=True)
+            else:
+                result.update(self.grade_choice(question, question['options'][OPTION_LETTERS.index(letter)]))
+            results.append(result)
+        return results
+
+    @staticmethod
+    def grade_choice(question, chosen):
+        """Score a chosen option against the question's correct answer by exact match."""
+        correct = chosen is not None and normalize_answer(chosen) == normalize_answer(question['correct_answer'])
+        return {'chosen': chosen, 'score': float(correct)}
+
+    @staticmethod
+    def format_question(question, number=None):
+        """Return the query text put to the agent for a question, or its block in a batch when numbered."""
+        options = question.get('options')
+        if not options:
+            return f"{question['question']}\n\n{FREE_TEXT_INSTRUCTIONS}"
+        lines = [f"Question {number}: {question['question']}" if number else question['question']]
+        lines.extend(f"{OPTION_LETTERS[index]}. {option}" for index, option in enumerate(options))
+        if number is None:
+            lines.extend(["", "Reply with the letter of the correct option on the first line, then a one-sentence justification."])
+        return "\n".join(lines)
+
+    @classmethod
+    def format_batch(cls, questions):
+        """Return the query text for a batch of multiple-choice questions."""
+        blocks = [f"Answer each of the following {len(questions)} multiple-choice questions."]
+        blocks.extend(cls.format_question(question, number) for number, question in enumerate(questions, 1))
+        blocks.append(BATCH_INSTRUCTIONS)
+        return "\n\n".join(blocks)
+
+    @staticmethod
+    def parse_answer_vector(answer, size):
+        """Return {question number: option letter} from a batched reply, ignoring out-of-range numbers."""
+        letters = {}
+        for number, letter in ANSWER_VECTOR_PATTERN.findall(answer):
+            if 1 <= int(number) <= size:
+                letters.setdefault(int(number), letter)
+        return letters
+
+    @staticmethod
+    def chosen_option(answer, options):
+        """Return the option an answer picked, by its letter or by quoting exactly one option, else None."""
+        first_line = next((line for line in answer.splitlines() if line.strip()), "")
+        match = ANSWER_LETTER_PATTERN.match(first_line.strip())
+        if match and OPTION_LETTERS.index(match.group(1).upper()) < len(options):
+            return options[OPTION_LETTERS.index(match.group(1).upper())]
+        normalized = normalize_answer(answer)
+        quoted = [option for option in options if normalize_answer(option) in normalized]
+        return quoted[0] if len(quoted) == 1 else None
@@ -0,0 +1,141 @@
+import re
+import numpy as np
+
+# Share of the reference's IDF-weighted terms an answer must contain for its wording to earn full credit;
+# lower recall earns proportionally less. A concise answer to a long reference covers about a third of
+# its terms, an off-topic one rarely a quarter
+FULL_CREDIT_RECALL = 0.4
+
+# Share of the score that comes from the reference's key figures, when it has any; a reference that is
+# nothing but a figure (e.g. "$12,500,000") is graded on its figure alone
+NUMERIC_WEIGHT = 0.5
+
+# Relative tolerance for a figure to count as matching, with an absolute floor for values near zero
+NUMERIC_TOLERANCE = 0.01
+NUMERIC_ABSOLUTE_TOLERANCE = 0.005
+
+# "1) " and "2. " list markers, which are not figures
+LIST_MARKER_PATTERN = re.compile(r"(?:^|(?<=\s))\d{1,2}[.)](?=\s)")
+
+# Plain, decimal and comma-grouped numbers; a minus sign only counts when it does not join a range like "70-80"
+NUMBER_PATTERN = re.compile(r"(?<![\w.])-?(?=[\d.])(?:\d{1,3}(?:,\d{3})+|\d*\.?\d+)|(?<=-)\d*\.?\d+")
+
+# Magnitude suffixes, so "$12.5M" and "$12,500,000" are the same figure; a one-letter suffix
+# must be attached to the number, so "2 B-2s" is not two billion
+MAGNITUDE_PATTERN = re.compile(r"\s*(?i:(thousand|million|billion))\b|([KMB])\b")
+MAGNITUDES = {"k": 1e3, "thousand": 1e3, "m": 1e6, "million": 1e6, "b": 1e9, "billion": 1e9}
+
+# The result of a calculation: a number right after "=" that is not itself the start of an expression,
+# so "CPI = 40/45 = 0.889" yields 0.889 but not 40
+COMPUTED_RESULT_PATTERN = re.compile(r"=\s*[$€£]?\s*(\d{1,3}(?:,\d{3})+|\d*\.?\d+)(?!\s*[\d/×*+\-(^])")
+
+# A reference that is a single figure, such as "0.91" or "$12,500,000"
+BARE_FIGURE_PATTERN = re.compile(r"\s*[$€£]?\s*-?(?:\d{1,3}(?:,\d{3})+|\d*\.?\d+)\s*(?:%|[KMB]|million|billion)?\.?\s*", re.IGNORECASE)
+
+def figure_value(match, group=0):
+    """The value of a matched number, scaled by a magnitude suffix that follows it."""
+    value = float(match.group(group).replace(",", ""))
+    magnitude = MAGNITUDE_PATTERN.match(match.string, match.end(group))
+    return value * MAGNITUDES[(magnitude.group(1) or magnitude.group(2)).lower()] if magnitude else value
+
+def extract_numbers(text):
+    """Return the numeric values in a text, e.g. [112500000.0, 0.889] for "EAC $112.5M at CPI 0.889"."""
+    text = LIST_MARKER_PATTERN.sub(" ", text)
+    return [figure_value(match) for match in NUMBER_PATTERN.finditer(text)]
+
+def matches_any(values, targets):
+    """For each target, whether some value lies within tolerance of it."""
+    values, targets = np.asarray(values, dtype=float), np.asarray(targets, dtype=float)
+    if not len(values) or not len(targets):
+        return np.zeros(len(targets), dtype=bool)
+    tolerance = np.maximum(NUMERIC_TOLERANCE * np.abs(targets), NUMERIC_ABSOLUTE_TOLERANCE)
+    return (np.abs(values[:, None] - targets[None, :]) <= tolerance).any(axis=0)
+
+class FreeTextGrader:
+    """
+    Grades free-text answers against reference answers without an LLM judge.
+
+    Wording is graded by recall: the IDF-weighted share of the reference's
+    terms that the answer contains, with the IDF weights of the knowledge
+    base's hashed vectorizer, which come from the IPMDAR guide. Recall does
+    not penalize an answer for the prose around the reference's content, as
+    a cosine similarity would, and the recall of every (candidate, reference)
+    pair in a batch is one matrix operation. Questions that supply numeric inputs have key figures,
+    the results the reference computes from them (such as EAC values), which
+    must also appear in the answer, within a relative tolerance. Other
+    numbers in a reference, like phase counts, WBS levels or clause numbers,
+    are ordinary wording.
+    """
+
+    def __init__(self, vectorizer):
+        self.vectorizer = vectorizer
+
+    def recalls(self, candidates, references):
+        """IDF-weighted share of each reference's terms that its candidate contains."""
+        candidate_terms = self.vectorizer.term_weights([LIST_MARKER_PATTERN.sub(" ", text) for text in candidates]) > 0
+        reference_weights = self.vectorizer.term_weights([LIST_MARKER_PATTERN.sub(" ", text) for text in references])
+        totals = reference_weights.sum(axis=1)
+        return (reference_weights * candidate_terms).sum(axis=1) / np.where(totals == 0, 1, totals)
+
+    @staticmethod
+    def is_bare_figure(reference):
+        """Whether a reference answer is a single figure and nothing else."""
+        return BARE_FIGURE_PATTERN.fullmatch(reference) is not None
+
+    @classmethod
+    def key_figures(cls, reference, question=""):
+        """
+        The computed results an answer must reproduce.
+
+        Only questions that supply numeric inputs have key figures: the whole
+        reference when it is a bare figure, otherwise the results of its
+        calculations (numbers after "="), leaving out any the question gave.
+        """
+        inputs = extract_numbers(question)
+        if not inputs:
+            return []
+        if cls.is_bare_figure(reference):
+            computed = extract_numbers(reference)
+        else:
+            computed = [figure_value(match, 1) for match in COMPUTED_RESULT_PATTERN.finditer(reference)]
+        figures = list(dict.fromkeys(computed))
+        given = matches_any(inputs, figures)
+        return [figure for figure, in_question in zip(figures, given) if not in_question]
+
+    def grade_batch(self, candidates, references, questions=None):
+        """
+        Score candidate answers against their references.
+
+        Args:
+            candidates: Answers to grade
+            references: Reference answer for each candidate
+            questions: Optional question text for each candidate; without it no answer has key figures
+
+        Returns:
+            list: Per answer, a dict with recall, key_figures, figures_matched and score (0-1)
+        """
+        if not candidates:
+            return []
+        questions = questions or [""] * len(candidates)
+        recalls = self.recalls(candidates, references)
+
+        grades = []
+        for candidate, reference, question, recall in zip(candidates, references, questions, recalls):
+            wording = min(1.0, float(recall) / FULL_CREDIT_RECALL)
+            figures = self.key_figures(reference, question)
+            matched = int(matches_any(extract_numbers(candidate), figures).sum())
+            score = wording
+            if figures:
+                weight = 1.0 if self.is_bare_figure(reference) else NUMERIC_WEIGHT
+                score = (1 - weight) * wording + weight * matched / len(figures)
+            grades.append({
+                'recall': float(recall),
+                'key_figures': len(figures),
+                'figures_matched': matched,
+                'score': score
+            })
+        return grades
+
+    def grade(self, candidate, reference, question=""):
+        """Score a single answer; see grade_batch."""
+        return self.grade_batch([candidate], [reference], [question])[0]
@@ -1,9 +1,14 @@
 import os
 import json
 import time
+import hashlib
 import random
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime
+from .assessment_engine import AssessmentEngine
+from .adaptive_testing import AdaptiveAssessment, ItemCalibration
 from .training_modules import (
     compliance_policy_training,
     data_analytics_training,
@@ -25,6 +30,31 @@ logging.basicConfig(
 
 logger = logging.getLogger("IPMDAR Training Camp")
 
+# Agents trained at once by train_agents and submit_training
+TRAINING_WORKERS = int(os.getenv("IPMDAR_TRAINING_WORKERS", "6"))
+
+# Average assessment score an agent needs to be certified
+CERTIFICATION_PASSING_SCORE = 0.85
+
+# "full" asks every question (multiple-choice ones batched); "adaptive" asks one question at a
+# time and stops once the pass/fail decision is clear, which pays off on larger question banks
+ASSESSMENT_MODE = os.getenv("IPMDAR_ASSESSMENT_MODE", "full")
+
+# Share of the assessment's questions the providers must answer for the result to count; below it, provider
+# errors or rate limiting decide the score rather than the agent, so the assessment is retried later
+MIN_ANSWERED_SHARE = float(os.getenv("IPMDAR_MIN_ANSWERED_SHARE", "0.8"))
+
+# Delay before retrying an inconclusive assessment, doubling with each further attempt up to the maximum
+ASSESSMENT_RETRY_SECONDS = float(os.getenv("IPMDAR_ASSESSMENT_RETRY_SECONDS", "60"))
+MAX_ASSESSMENT_RETRY_SECONDS = 900
+
+# Part of every curriculum version; bump it when module content changes without the module names changing,
+# so that interrupted training does not resume onto modules completed under the old content
+CURRICULUM_REVISION = 1
+
+class AssessmentInconclusive(Exception):
+    """Too few assessment questions were answered, because of provider errors, for a pass/fail decision."""
+
 class IPMDARTrainingCamp:
     """
     IPMDAR Training Camp - Comprehensive training system for AI agents to 
@@ -35,15 +65,27 @@ class IPMDARTrainingCamp:
     continuous learning.
     """
     
-    def __init__(self, knowledge_base=None):
+    def __init__(self, knowledge_base=None, max_workers=TRAINING_WORKERS):
         """
         Initialize the IPMDAR Training Camp.
         
         Args:
             knowledge_base: Optional pre-loaded knowledge base
+            max_workers: Number of agents that may train concurrently
         """
         self.knowledge_base = knowledge_base
         self.certification_status = {}
+        self.training_progress = {}
+        self.progress_listeners = []
+        self.training_jobs = {}
+        self.deferred_training = {}
+        self.assessment_attempts = {}
+        self.agents = {}
+        self.assessment_engine = AssessmentEngine()
+        self.training_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="training")
+        # Guards certification_status, training_progress, training_jobs and deferred_training,
+        # which training threads update concurrently
+        self._lock = threading.RLock()
         self.training_modules = {
             'compliance_policy': compliance_policy_training.CompliancePolicyTraining(),
             'data_analytics': data_analytics_training.DataAnalyticsTraining(),
@@ -56,6 +98,12 @@ class IPMDARTrainingCamp:
         # Load certification records if they exist
         self.certification_records_path = 'ipmdar_camp/logs/certification_records.json'
         self.load_certification_records()
+        
+        # Item difficulty and discrimination for adaptive assessments, calibrated from past results
+        self.item_calibration = ItemCalibration(
+            os.path.join(os.path.dirname(self.certification_records_path), 'item_calibration.json')
+        )
+        self.adaptive_assessment = AdaptiveAssessment(self.assessment_engine, self.item_calibration)
     
     def load_certification_records(self):
         """Load existing certification records if available."""
@@ -69,12 +117,25 @@ class IPMDARTrainingCamp:
         except Exception as e:
             logger.error(f"Error loading certification records: {e}")
     
-    def save_certification_records(self):
-        """Save certification records to persistent storage."""
+    def save_certification_records(self, checkpoint=False):
+        """
+        Save certification records to persistent storage.
+        
+        The records are written to a per-process temporary file that then
+        replaces the store, so neither a crash mid-write nor another worker
+        process saving at the same time can corrupt it.
+        
+        Args:
+            checkpoint: Whether this is a mid-training checkpoint, which is logged at debug level
+        """
         try:
-            with open(self.certification_records_path, 'w') as f:
-                json.dump(self.certification_status, f, indent=2)
-            logger.info(f"Saved certification records for {len(self.certification_status)} agents")
+            with self._lock:
+                temporary_path = f"{self.certification_records_path}.{os.getpid()}.tmp"
+                with open(temporary_path, 'w') as f:
+                    json.dump(self.certification_status, f, indent=2)
+                os.replace(temporary_path, self.certification_records_path)
+                logger.log(logging.DEBUG if checkpoint else logging.INFO,
+                           f"Saved certification records for {len(self.certification_status)} agents")
         except Exception as e:
             logger.error(f"Error saving certification records: {e}")
     
@@ -82,6 +143,15 @@ class IPMDARTrainingCamp:
         """
         Train an AI agent through the complete IPMDAR curriculum.
         
+        Each completed module is checkpointed to the certification records.
+        If the agent's last training was interrupted before its assessment
+        and the curriculum version is unchanged, training resumes: modules
+        already completed are skipped rather than repeated.
+        
+        An assessment that provider errors left inconclusive is not recorded
+        as a failure; training is deferred and retried with backoff, resuming
+        straight at the assessment.
+        
         Args:
             agent_id: Unique identifier for the agent
             agent_type: Type of agent (e.g., 'compliance_policy', 'data_analytics')
@@ -91,58 +161,276 @@ class IPMDARTrainingCamp:
             bool: True if agent is certified (either already or after training)
         """
         # Check if agent is already certified and training isn't forced
-        if agent_id in self.certification_status and self.certification_status[agent_id]['certified'] and not force_retrain:
+        if self.verify_agent_certification(agent_id) and not force_retrain:
             logger.info(f"Agent {agent_id} ({agent_type}) is already certified. Skipping training.")
             return True
         
         logger.info(f"Beginning training for Agent {agent_id} ({agent_type})...")
         
-        # Initialize or reset certification record
-        self.certification_status[agent_id] = {
-            'agent_id': agent_id,
-            'agent_type': agent_type,
-            'training_started': datetime.now().isoformat(),
-            'training_completed': None,
-            'curriculum_progress': {},
-            'assessment_scores': {},
-            'certified': False,
-            'certification_date': None
-        }
+        core_modules = self._get_core_curriculum(agent_type)
+        specialized_modules = self._get_specialized_curriculum(agent_type)
+        cross_domain_modules = self._get_cross_domain_curriculum(agent_type)
+        curriculum_version = self._get_curriculum_version(
+            agent_type, core_modules, specialized_modules, cross_domain_modules
+        )
+        
+        # Resume an interrupted run of the same curriculum, otherwise initialize or reset the certification record
+        with self._lock:
+            record = self.certification_status.get(agent_id)
+            resumed = self._is_resumable(record, agent_type, curriculum_version)
+            if resumed:
+                record['training_resumed'] = datetime.now().isoformat()
+            else:
+                record = {
+                    'agent_id': agent_id,
+                    'agent_type': agent_type,
+                    'curriculum_version': curriculum_version,
+                    'training_started': datetime.now().isoformat(),
+                    'training_completed': None,
+                    'curriculum_progress': {},
+                    'assessment_scores': {},
+                    'certified': False,
+                    'certification_date': None
+                }
+                self.certification_status[agent_id] = record
+            modules_completed = sum(
+                1 for module in core_modules + specialized_modules + cross_domain_modules
+                if self._is_module_completed(agent_id, module)
+            )
+            self.training_progress[agent_id] = {
+                'modules_total': len(core_modules) + len(specialized_modules) + len(cross_domain_modules),
+                'modules_completed': modules_completed
+            }
+        if resumed:
+            logger.info(f"Resuming training for Agent {agent_id} with {modules_completed} modules already completed")
+        self.save_certification_records(checkpoint=True)
+        self._emit_progress(agent_id, agent_type, 'started', resumed=resumed)
         
         try:
             # Execute core curriculum for the agent type
-            core_modules = self._get_core_curriculum(agent_type)
             self._complete_core_curriculum(agent_id, agent_type, core_modules)
             
             # Execute specialized curriculum for the agent type
-            specialized_modules = self._get_specialized_curriculum(agent_type)
             self._complete_specialized_curriculum(agent_id, agent_type, specialized_modules)
             
             # Execute cross-domain training for holistic understanding
-            cross_domain_modules = self._get_cross_domain_curriculum(agent_type)
             self._complete_cross_domain_training(agent_id, agent_type, cross_domain_modules)
             
             # Conduct final assessment and certification
+            self._emit_progress(agent_id, agent_type, 'assessment')
             certification_result = self._conduct_certification_assessment(agent_id, agent_type)
             
             # Update certification status
-            self.certification_status[agent_id]['certified'] = certification_result
+            with self._lock:
+                self.certification_status[agent_id]['certified'] = certification_result
+                if certification_result:
+                    self.certification_status[agent_id]['certification_date'] = datetime.now().isoformat()
+                    self.certification_status[agent_id]['training_completed'] = datetime.now().isoformat()
             if certification_result:
-                self.certification_status[agent_id]['certification_date'] = datetime.now().isoformat()
-                self.certification_status[agent_id]['training_completed'] = datetime.now().isoformat()
                 logger.info(f"Agent {agent_id} ({agent_type}) successfully certified!")
             else:
                 logger.warning(f"Agent {agent_id} ({agent_type}) failed certification assessment.")
             
             # Save updated certification records
             self.save_certification_records()
+            self._emit_progress(agent_id, agent_type, 'certified' if certification_result else 'failed')
             
             return certification_result
             
+        except AssessmentInconclusive as e:
+            retry_seconds = self._defer_training(agent_id, agent_type)
+            logger.warning(
+                f"Certification assessment for Agent {agent_id} was inconclusive ({e}); "
+                f"retrying in {retry_seconds:.0f}s"
+            )
+            self._emit_progress(agent_id, agent_type, 'deferred', error=str(e), retry_seconds=retry_seconds)
+            return False
+            
         except Exception as e:
             logger.error(f"Error during training for Agent {agent_id}: {e}")
+            self._emit_progress(agent_id, agent_type, 'failed', error=str(e))
             return False
     
+    def register_agent(self, agent_id, agent):
+        """
+        Register the agent instance that certification assessments put questions to.
+        
+        Args:
+            agent_id: Unique identifier for the agent
+            agent: The BaseAgent answering as agent_id
+        """
+        with self._lock:
+            self.agents[agent_id] = agent
+    
+    def submit_training(self, agent_id, agent_type, force_retrain=False):
+        """
+        Queue training for an agent on the camp's worker pool.
+        
+        An agent that is already queued or training is not queued again; the
+        job already under way is returned instead.
+        
+        Args:
+            agent_id: Unique identifier for the agent
+            agent_type: Type of agent (e.g., 'compliance_policy', 'data_analytics')
+            force_retrain: Force retraining even if already certified
+            
+        Returns:
+            Future: Resolves to the result of train_agent
+        """
+        with self._lock:
+            # A deferred retry is superseded by this request
+            deferred = self.deferred_training.pop(agent_id, None)
+            if deferred is not None:
+                deferred.cancel()
+            job = self.training_jobs.get(agent_id)
+            if job is None or job.done():
+                job = self.training_executor.submit(self.train_agent, agent_id, agent_type, force_retrain)
+                self.training_jobs[agent_id] = job
+            return job
+    
+    def _defer_training(self, agent_id, agent_type):
+        """
+        Schedule another training run after an inconclusive assessment.
+        
+        Returns:
+            float: Seconds until the retry, doubling with each consecutive inconclusive assessment
+        """
+        with self._lock:
+            attempts = self.assessment_attempts.get(agent_id, 0) + 1
+            self.assessment_attempts[agent_id] = attempts
+            retry_seconds = min(ASSESSMENT_RETRY_SECONDS * 2 ** (attempts - 1), MAX_ASSESSMENT_RETRY_SECONDS)
+            timer = threading.Timer(retry_seconds, self.submit_training, (agent_id, agent_type))
+            timer.daemon = True
+            self.deferred_training[agent_id] = timer
+            timer.start()
+        return retry_seconds
+    
+    def train_agents(self, agent_types, force_retrain=False):
+        """
+        Train several agents concurrently and wait for all of them.
+        
+        Agents train in parallel on the camp's bounded worker pool, so
+        certifying the whole panel takes about as long as the slowest agent.
+        
+        Args:
+            agent_types: Dict mapping agent_id to agent type
+            force_retrain: Force retraining even if already certified
+            
+        Returns:
+            dict: agent_id -> True if the agent is certified
+        """
+        jobs = {
+            agent_id: self.submit_training(agent_id, agent_type, force_retrain)
+            for agent_id, agent_type in agent_types.items()
+        }
+        wait(jobs.values())
+        return {agent_id: job.result() for agent_id, job in jobs.items()}
+    
+    def get_training_state(self, agent_id):
+        """
+        Get where an agent is in its training lifecycle.
+        
+        Returns:
+            str: "ready", "queued", "training", "deferred" (waiting to retry an
+            inconclusive assessment), "failed" or "untrained"
+        """
+        if self.verify_agent_certification(agent_id):
+            return "ready"
+        with self._lock:
+            job = self.training_jobs.get(agent_id)
+            deferred = agent_id in self.deferred_training
+        if job is not None and not job.done():
+            return "training" if job.running() else "queued"
+        if deferred:
+            return "deferred"
+        if job is None:
+            return "untrained"
+        return "failed"
+    
+    def get_training_progress(self, agent_id):
+        """
+        Get the latest training progress event for an agent.
+        
+        Returns:
+            dict: Progress details or None if the agent has not trained in this process
+        """
+        with self._lock:
+            progress = self.training_progress.get(agent_id)
+            return dict(progress) if progress else None
+    
+    def add_progress_listener(self, listener):
+        """
+        Register a callable that receives every training progress event.
+        
+        Events are dicts with agent_id, agent_type, stage ('started',
+        'module_completed', 'assessment', 'certified', 'failed' or
+        'deferred'), modules_completed, modules_total and timestamp, plus
+        module and score for completed modules and retry_seconds for
+        deferred ones. Listeners run on the training threads.
+        """
+        with self._lock:
+            self.progress_listeners.append(listener)
+    
+    def _emit_progress(self, agent_id, agent_type, stage, **details):
+        """Record a progress event for an agent and pass it to the listeners."""
+        with self._lock:
+            progress = self.training_progress.get(agent_id, {'modules_total': 0, 'modules_completed': 0})
+            # Each event is a new dict, so the events listeners already received are never changed
+            event = dict(
+                agent_id=agent_id,
+                agent_type=agent_type,
+                stage=stage,
+                modules_completed=progress['modules_completed'] + (stage == 'module_completed'),
+                modules_total=progress['modules_total'],
+                timestamp=datetime.now().isoformat(),
+                **details
+            )
+            self.training_progress[agent_id] = event
+            listeners = list(self.progress_listeners)
+        for listener in listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                logger.error(f"Error in training progress listener: {e}")
+    
+    def _record_module(self, agent_id, agent_type, module, score):
+        """Record and checkpoint a completed curriculum module, then emit its progress event."""
+        with self._lock:
+            self.certification_status[agent_id]['curriculum_progress'][module] = {
+                'completed': True,
+                'completion_date': datetime.now().isoformat(),
+                'score': score
+            }
+        self.save_certification_records(checkpoint=True)
+        self._emit_progress(agent_id, agent_type, 'module_completed', module=module, score=score)
+    
+    def _is_module_completed(self, agent_id, module):
+        """Whether the agent's current certification record has the module completed."""
+        with self._lock:
+            progress = self.certification_status.get(agent_id, {}).get('curriculum_progress', {})
+            return progress.get(module, {}).get('completed', False)
+    
+    @staticmethod
+    def _is_resumable(record, agent_type, curriculum_version):
+        """
+        Whether a certification record is an interrupted run of the given curriculum.
+        
+        A record is resumable until its certification assessment has run:
+        records that were assessed, certified or not, start over.
+        """
+        return (
+            record is not None
+            and record.get('agent_type') == agent_type
+            and record.get('curriculum_version') == curriculum_version
+            and 'final_score' not in record
+            and not record.get('certified')
+        )
+    
+    def _get_curriculum_version(self, agent_type, core_modules, specialized_modules, cross_domain_modules):
+        """Identify an agent type's curriculum by its modules and CURRICULUM_REVISION."""
+        curriculum = [CURRICULUM_REVISION, agent_type, core_modules, specialized_modules, cross_domain_modules]
+        return hashlib.sha1(json.dumps(curriculum).encode()).hexdigest()[:12]
+    
     def _get_core_curriculum(self, agent_type):
         """Get the core curriculum modules for a specific agent type."""
         # All agents need to complete these fundamental modules
@@ -254,6 +542,9 @@ class IPMDARTrainingCamp:
         
         # Process each core module
         for module in modules:
+            if self._is_module_completed(agent_id, module):
+                logger.info(f"  - Skipping completed core module: {module}")
+                continue
             logger.info(f"  - Completing core module: {module}")
             
             # Simulate training time
@@ -261,11 +552,7 @@ class IPMDARTrainingCamp:
             
             # Record progress
             score = random.uniform(0.90, 1.0)  # Simulate high scores for core modules
-            self.certification_status[agent_id]['curriculum_progress'][module] = {
-                'completed': True,
-                'completion_date': datetime.now().isoformat(),
-                'score': score
-            }
+            self._record_module(agent_id, agent_type, module, score)
             
             logger.info(f"    Completed with score: {score:.2f}")
     
@@ -280,6 +567,9 @@ class IPMDARTrainingCamp:
         
         # Process each specialized module
         for module in modules:
+            if self._is_module_completed(agent_id, module):
+                logger.info(f"  - Skipping completed specialized module: {module}")
+                continue
             logger.info(f"  - Completing specialized module: {module}")
             
             # Simulate training time
@@ -287,11 +577,7 @@ class IPMDARTrainingCamp:
             
             # Record progress
             score = random.uniform(0.85, 1.0)  # Slightly more variation in specialized modules
-            self.certification_status[agent_id]['curriculum_progress'][module] = {
-                'completed': True,
-                'completion_date': datetime.now().isoformat(),
-                'score': score
-            }
+            self._record_module(agent_id, agent_type, module, score)
             
             logger.info(f"    Completed with score: {score:.2f}")
     
@@ -301,6 +587,9 @@ class IPMDARTrainingCamp:
         
         # Process each cross-domain module
         for module in modules:
+            if self._is_module_completed(agent_id, module):
+                logger.info(f"  - Skipping completed cross-domain module: {module}")
+                continue
             logger.info(f"  - Completing cross-domain module: {module}")
             
             # Simulate training time
@@ -308,11 +597,7 @@ class IPMDARTrainingCamp:
             
             # Record progress
             score = random.uniform(0.80, 0.95)  # Lower scores expected in cross-domain areas
-            self.certification_status[agent_id]['curriculum_progress'][module] = {
-                'completed': True,
-                'completion_date': datetime.now().isoformat(),
-                'score': score
-            }
+            self._record_module(agent_id, agent_type, module, score)
             
             logger.info(f"    Completed with score: {score:.2f}")
     
@@ -322,6 +607,9 @@ class IPMDARTrainingCamp:
         
         Returns:
             bool: True if agent passed certification, False otherwise
+            
+        Raises:
+            AssessmentInconclusive: If the providers answered less than MIN_ANSWERED_SHARE of the questions
         """
         logger.info(f"Conducting certification assessment for Agent {agent_id} ({agent_type})")
         
@@ -331,38 +619,68 @@ class IPMDARTrainingCamp:
             logger.error(f"No training module found for agent type: {agent_type}")
             return False
         
-        # Simulate assessment process
-        time.sleep(1.0)  # Comprehensive assessment takes longer
+        agent = self.agents.get(agent_id)
+        if agent is None:
+            logger.error(f"Agent {agent_id} is not registered with the training camp and cannot be assessed")
+            return False
         
-        # Calculate scores across different assessment areas
-        assessment_areas = [
-            'knowledge_comprehension',
-            'practical_application',
-            'problem_solving',
-            'adaptability',
-            'cross_domain_understanding'
-        ]
+        # Put the module's question banks to the agent itself and grade its answers
+        questions = training_module.get_certification_questions()
+        if ASSESSMENT_MODE == 'adaptive':
+            results = self.adaptive_assessment.assess(agent, questions, CERTIFICATION_PASSING_SCORE)
+            logger.info(
+                f"  Adaptive test asked {len(results['questions'])} of {len(questions)} questions: "
+                f"ability {results['ability']:.2f} ± {results['standard_error']:.2f} (cut {results['cut_ability']:.2f})"
+            )
+        else:
+            results = self.assessment_engine.assess(agent, questions)
+        average_score = results['score']
+        objective_score = self.assessment_engine.objective_score(results['questions'])
         
-        total_score = 0
-        assessment_scores = {}
+        # Every graded answer also calibrates the items for later adaptive tests
+        self.item_calibration.record_session(agent_id, questions, results['questions'])
         
-        for area in assessment_areas:
-            # Simulate assessment scoring
-            score = random.uniform(0.85, 1.0)
-            assessment_scores[area] = score
-            total_score += score
-            logger.info(f"  - Assessment area '{area}': {score:.2f}")
+        # Questions the providers failed to answer are left out of the score; with too many of them
+        # the score would reflect provider health rather than the agent, so nothing is decided
+        asked = len(results['questions'])
+        if not asked or results['answered'] / asked < MIN_ANSWERED_SHARE:
+            raise AssessmentInconclusive(
+                f"providers answered {results['answered']} of {asked} questions, "
+                f"{MIN_ANSWERED_SHARE:.0%} needed"
+            )
+        with self._lock:
+            self.assessment_attempts.pop(agent_id, None)
         
-        # Calculate average score
-        average_score = total_score / len(assessment_areas)
-        logger.info(f"  Assessment complete. Average score: {average_score:.2f}")
+        for assessment_id, score in results['assessment_scores'].items():
+            logger.info(f"  - Assessment '{assessment_id}': {score:.2f}")
+        logger.info(
+            f"  Assessment complete. Average score: {average_score:.2f} "
+            f"({results['answered']} of {asked} questions answered in {results['provider_calls']} calls, "
+            f"{results['failed_calls']} failed calls, "
+            f"{results['prompt_tokens'] + results['completion_tokens']} tokens, "
+            f"{results['elapsed_seconds']:.1f}s)"
+        )
+        if objective_score is not None:
+            logger.info(f"  Score without wording-only free-text grades: {objective_score:.2f}")
         
         # Store assessment results
-        self.certification_status[agent_id]['assessment_scores'] = assessment_scores
-        self.certification_status[agent_id]['final_score'] = average_score
+        with self._lock:
+            self.certification_status[agent_id]['assessment_scores'] = results['assessment_scores']
+            self.certification_status[agent_id]['assessment_results'] = {
+                key: results[key]
+                for key in ('questions', 'answered', 'batched', 'provider_calls', 'failed_calls', 'prompt_tokens', 'completion_tokens',
+                            'elapsed_seconds', 'ability', 'standard_error', 'cut_ability', 'stopped_early')
+                if key in results
+            }
+            self.certification_status[agent_id]['assessment_results']['objective_score'] = objective_score
+            self.certification_status[agent_id]['final_score'] = average_score
         
-        # Certification requires an average score of at least 0.85 (85%)
-        certified = average_score >= 0.85
+        # Certification requires an average score of at least 0.85 (85%). Free-text answers without key
+        # figures are graded on wording alone, which is not yet validated on enough real answers to fail
+        # an agent by itself, so passing on the remaining questions also certifies
+        certified = average_score >= CERTIFICATION_PASSING_SCORE or (
+            objective_score is not None and objective_score >= CERTIFICATION_PASSING_SCORE
+        )
         return certified
     
     def verify_agent_certification(self, agent_id):
@@ -375,8 +693,9 @@ class IPMDARTrainingCamp:
         Returns:
             bool: True if agent is certified, False otherwise
         """
-        if agent_id in self.certification_status:
-            return self.certification_status[agent_id]['certified']
+        with self._lock:
+            if agent_id in self.certification_status:
+                return self.certification_status[agent_id]['certified']
         return False
     
     def get_certification_details(self, agent_id):
@@ -405,8 +724,11 @@ class IPMDARTrainingCamp:
         if training_date is None:
             training_date = datetime.now().isoformat()
         
-        if agent_id in self.certification_status:
-            self.certification_status[agent_id]['refresher_training_scheduled'] = training_date
+        with self._lock:
+            record = self.certification_status.get(agent_id)
+            if record is not None:
+                record['refresher_training_scheduled'] = training_date
+        if record is not None:
             self.save_certification_records()
             logger.info(f"Refresher training scheduled for Agent {agent_id} on {training_date}")
             return training_date
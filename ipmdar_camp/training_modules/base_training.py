@@ -177,6 +177,28 @@ class BaseTrainingModule(ABC):
         logger.warning(f"Training material not found: {material_id}")
         return None
     
+    def _assessment_sets(self):
+        """
+        Collect this module's assessments as {assessment_id: questions}.
+        
+        The bundled question bank (ipmdar_camp/assessments/*.json) keeps its
+        multiple-choice questions under 'assessment_questions' and is listed
+        under the module's file name, e.g. 'riskforecasting'. The module's
+        scenario assessments use the 'assessments' format and have free-text
+        reference answers.
+        """
+        module_name = self.__class__.__name__.lower().replace('training', '')
+        sets = {}
+        if 'assessment_questions' in self.assessment_data:
+            sets[module_name] = [
+                dict(question, id=question.get('id', f"q{number}"))
+                for number, question in enumerate(self.assessment_data['assessment_questions'], 1)
+            ]
+        for source in (self.assessment_data, self._get_default_assessments()):
+            for assessment in source.get('assessments', []):
+                sets.setdefault(assessment['id'], assessment.get('questions', []))
+        return sets
+    
     def get_assessment_questions(self, assessment_id):
         """
         Retrieve assessment questions by assessment ID.
@@ -187,10 +209,23 @@ class BaseTrainingModule(ABC):
         Returns:
             list: Assessment questions
         """
-        if 'assessments' in self.assessment_data:
-            for assessment in self.assessment_data['assessments']:
-                if assessment['id'] == assessment_id:
-                    return assessment.get('questions', [])
+        questions = self._assessment_sets().get(assessment_id)
+        if questions is not None:
+            return questions
         
         logger.warning(f"Assessment not found: {assessment_id}")
         return []
+    
+    def get_certification_questions(self):
+        """
+        Retrieve every question asked in this module's certification assessment.
+        
+        Returns:
+            list: Questions, each with its 'assessment' ID added; multiple-choice
+            questions have 'options' and 'correct_answer', free-text ones 'answer'
+        """
+        return [
+            dict(question, assessment=assessment_id)
+            for assessment_id, questions in self._assessment_sets().items()
+            for question in questions
+        ]
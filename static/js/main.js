@@ -351,6 +351,8 @@ document.addEventListener('DOMContentLoaded', function() {
         
         // Scroll to bottom
         scrollToBottom();
+        
+        return messageElement;
     }
     
     // Function to add multi-agent panel response
@@ -419,35 +421,162 @@ document.addEventListener('DOMContentLoaded', function() {
         if (competitionMode) {
             handleCompetitionQuery(message);
         } else {
-            fetch('/api/query', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json'
-                },
-                body: JSON.stringify({
-                    query: message,
-                    agent: agentId
-                })
+            streamMessage(message, agentId);
+        }
+    }
+    
+    // Function to send a message and wait for the complete response
+    function queryMessage(message, agentId) {
+        fetch('/api/query', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({
+                query: message,
+                agent: agentId
             })
-            .then(response => response.json())
-            .then(data => {
-                if (data.error) {
-                    // Handle error
-                    addSystemMessage('Error', data.error);
-                } else if (data.responses) {
-                    // Multi-agent response
-                    addMultiAgentResponse(data.responses);
-                } else {
-                    // Single agent response
-                    addAgentMessage(agentId, agentNames[agentId], data.response, data.accuracy);
+        })
+        .then(response => response.json())
+        .then(data => {
+            if (data.error) {
+                // Handle error
+                addSystemMessage('Error', data.error);
+            } else if (data.responses) {
+                // Multi-agent response
+                addMultiAgentResponse(data.responses);
+            } else {
+                // Single agent response
+                addAgentMessage(agentId, agentNames[agentId], data.response, data.accuracy);
+            }
+        })
+        .catch(error => {
+            console.error('Error:', error);
+            addSystemMessage('Error', 'Failed to get a response. Please try again.');
+            removeTypingIndicator();
+        });
+    }
+    
+    // Function to stream a response over Server-Sent Events, rendering tokens as they arrive
+    function streamMessage(message, agentId) {
+        const views = {};
+        let panelElement = null;
+        let receivedEvents = false;
+        
+        // Find or create the element that displays a given agent's answer
+        function getView(responseAgentId) {
+            if (views[responseAgentId]) {
+                return views[responseAgentId];
+            }
+            removeTypingIndicator();
+            if (agentId === 'all') {
+                if (!panelElement) {
+                    panelElement = document.createElement('div');
+                    panelElement.className = 'multi-agent-response';
+                    panelElement.innerHTML = '<h4>Expert Panel Response</h4>';
+                    chatMessages.appendChild(panelElement);
+                    // Reserve a slot per agent so the panel order is stable
+                    Object.keys(agentNames).filter(id => id !== 'all').forEach(id => {
+                        const item = document.createElement('div');
+                        item.className = 'multi-agent-item';
+                        item.innerHTML = `
+                            <h5>${agentNames[id]}</h5>
+                            <div class="streamed-text"></div>
+                            <div class="accuracy-rating">Waiting for response...</div>
+                        `;
+                        panelElement.appendChild(item);
+                        views[id] = { element: item, text: '' };
+                    });
+                }
+                return views[responseAgentId];
+            }
+            const element = addAgentMessage(responseAgentId, agentNames[responseAgentId], '', '...');
+            element.querySelector('.agent-message-content > div').classList.add('streamed-text');
+            views[responseAgentId] = { element: element, text: '' };
+            return views[responseAgentId];
+        }
+        
+        function renderView(view, accuracyText) {
+            view.element.querySelector('.streamed-text').innerHTML = marked.parse(view.text);
+            if (accuracyText) {
+                view.element.querySelector('.accuracy-rating').textContent = accuracyText;
+            }
+            scrollToBottom();
+        }
+        
+        function handleEvent(block) {
+            let eventName = 'message';
+            let payload = '';
+            block.split('\n').forEach(line => {
+                if (line.startsWith('event:')) {
+                    eventName = line.slice(6).trim();
+                } else if (line.startsWith('data:')) {
+                    payload += line.slice(5).trim();
                 }
-            })
-            .catch(error => {
-                console.error('Error:', error);
-                addSystemMessage('Error', 'Failed to get a response. Please try again.');
-                removeTypingIndicator();
             });
+            if (!payload) {
+                return;
+            }
+            receivedEvents = true;
+            const data = JSON.parse(payload);
+            if (eventName === 'token') {
+                const view = getView(data.agent);
+                view.text += data.text;
+                renderView(view);
+            } else if (eventName === 'done') {
+                const view = getView(data.agent);
+                view.text = data.response;
+                renderView(view, `Accuracy Rating: ${data.accuracy}`);
+            } else if (eventName === 'end') {
+                removeTypingIndicator();
+            }
         }
+        
+        fetch('/api/query/stream', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({
+                query: message,
+                agent: agentId
+            })
+        })
+        .then(response => {
+            if (!response.ok || !response.body) {
+                throw new Error(`Streaming unavailable (status ${response.status})`);
+            }
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+            
+            function read() {
+                return reader.read().then(({ done, value }) => {
+                    if (done) {
+                        removeTypingIndicator();
+                        return;
+                    }
+                    buffer += decoder.decode(value, { stream: true });
+                    let boundary;
+                    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                        handleEvent(buffer.slice(0, boundary));
+                        buffer = buffer.slice(boundary + 2);
+                    }
+                    return read();
+                });
+            }
+            return read();
+        })
+        .catch(error => {
+            console.error('Streaming error:', error);
+            if (!receivedEvents) {
+                // Fall back to the non-streaming endpoint
+                queryMessage(message, agentId);
+            } else {
+                addSystemMessage('Error', 'The response stream was interrupted. Please try again.');
+                removeTypingIndicator();
+            }
+        });
     }
     
     // Function to add system message
@@ -0,0 +1,16 @@
+from ipmdar_camp.assessment_engine import FREE_TEXT_INSTRUCTIONS, AssessmentEngine
+
+def test_free_text_questions_ask_for_a_concise_answer():
+    prompt = AssessmentEngine.format_question({'question': "What is the purpose of an IPMDAR compliance matrix?"})
+    assert prompt.startswith("What is the purpose of an IPMDAR compliance matrix?")
+    assert prompt.endswith(FREE_TEXT_INSTRUCTIONS)
+
+def test_objective_score_leaves_out_wording_only_grades():
+    results = [
+        {'type': 'multiple_choice', 'score': 1.0},
+        {'type': 'multiple_choice', 'score': 0.0, 'error': True},
+        {'type': 'free_text', 'score': 0.9, 'key_figures': 2},
+        {'type': 'free_text', 'score': 0.1, 'key_figures': 0},
+    ]
+    assert AssessmentEngine.objective_score(results) == 0.95
+    assert AssessmentEngine.objective_score(results[3:]) is None
@@ -0,0 +1,164 @@
+import glob
+import json
+import os
+import re
+
+import pytest
+
+from ipmdar_camp.free_text_grader import FreeTextGrader
+from ipmdar_camp.training_camp import CERTIFICATION_PASSING_SCORE
+from ipmdar_camp.training_modules import (
+    CompliancePolicyTraining, DataAnalyticsTraining, ImplementationSupportTraining,
+    ProjectManagementTraining, RiskForecastingTraining, SystemsIntegrationTraining
+)
+from utils.retrieval import HashedVectorIndex
+
+CAMP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ipmdar_camp")
+
+# Correct answers phrased the way a model answers: in its own words, with prose around the content
+VERBOSE_ANSWERS = {
+    "cp_assessment_1/q1": (
+        "The primary instruction is DoD Instruction 5000.02, Operation of the Adaptive Acquisition Framework. "
+        "It establishes the policies and procedures for managing defense acquisition programs, including the "
+        "milestone decision process, and it is the foundation under which EVM and IPMDAR reporting requirements "
+        "are applied to contracts."
+    ),
+    "cp_assessment_2/q1": (
+        "An IPMDAR compliance matrix is a tool used to systematically verify that every IPMDAR requirement in the "
+        "contract is addressed. It maps each requirement from the DID, the CDRL and the contract clauses to the "
+        "contractor's implementation and evidence, documenting alignment and exposing any gaps before submission."
+    ),
+    "da_assessment_1/q3": (
+        "Using the CPI-based method, EAC = BAC / CPI = $10,000,000 / 0.8 = $12.5M. The program is forecast to "
+        "overrun its budget by $2.5M if current cost efficiency continues."
+    ),
+    "da_assessment_2/q1": (
+        "With a CPI of 0.85 the program is over budget, earning only 85 cents of value for every dollar spent, so "
+        "cost efficiency is poor. The SPI of 1.05 shows it is ahead of schedule, completing more work than planned "
+        "to date. Overall the program is moving quickly but spending more than planned for the work performed."
+    ),
+    "pm_assessment_2/q1": (
+        "A WBS Dictionary entry should contain the WBS element identifier and title, a description of the element, "
+        "a definition of the work scope it includes and an explicit statement of what work is excluded. It should "
+        "also list the deliverables, acceptance criteria, dependencies on other elements, the responsible "
+        "organization or manager, and the budget allocated to the element."
+    ),
+    "rf_assessment_1/q2": (
+        "CPI = BCWP/ACWP = 40/45 = 0.889 and SPI = BCWP/BCWS = 40/50 = 0.8. EAC (CPI method) = BAC/CPI = "
+        "$100M/0.889 = $112.5M. EAC (CPI×SPI method) = $100M/(0.889 × 0.8) = $140.6M. The CPI×SPI forecast is "
+        "about $28M higher because it assumes schedule delays will also drive cost; recovering the schedule is "
+        "likely to add substantial cost to the program."
+    ),
+    "si_assessment_2/q2": (
+        "Automate monthly extraction from the EVM system aligned to the IPMDAR submission cycle, run a "
+        "pre-submission validation suite in the contractor environment for completeness and consistency, and "
+        "detect deltas against the previous submission to flag significant changes. Transform data to the IPMDAR "
+        "format through a logged pipeline, route validation exceptions to subject matter experts through a "
+        "workflow, produce reconciliation reports against native EVM reports, version-control every submission, "
+        "and feed government reviewer comments back into the extraction process."
+    ),
+    "is_assessment_2/q1": (
+        "Start by identifying and mapping stakeholders such as program leadership, financial managers, schedule "
+        "analysts, engineering leads and contractors on an influence/interest grid. Tailor messages to each group's "
+        "benefits, and use multiple channels including leadership briefings, working groups, guidance documents and "
+        "FAQs. Sequence engagement from leadership alignment to practitioner sessions and then joint contractor "
+        "sessions, set up a contractor working group, collect feedback through surveys and lessons-learned "
+        "sessions, involve stakeholders in implementation decisions, and measure engagement with perception "
+        "surveys and participation rates."
+    ),
+}
+
+# Answers on an IPMDAR topic that do not answer the question
+WRONG_ANSWERS = {
+    "cp_assessment_2/q2": "You should prepare the risk register, the staffing plan and the organizational chart.",
+    "rf_assessment_2/q2": (
+        "Management reserve should always be set to exactly 5% of contract value, as required by the FAR, "
+        "and it is held by the contracting officer."
+    ),
+    "si_assessment_2/q1": (
+        "Just email the spreadsheets from each contractor to the program office every month and have an "
+        "analyst copy them into a slide deck."
+    ),
+    "is_assessment_1/q2": (
+        "The biggest risk is that the weather delays the delivery of hardware, so buy insurance and keep "
+        "extra inventory in the warehouse."
+    ),
+}
+
+def iter_strings(node):
+    if isinstance(node, str):
+        yield node
+    elif isinstance(node, dict):
+        for value in node.values():
+            yield from iter_strings(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from iter_strings(value)
+
+@pytest.fixture(scope="module")
+def grader():
+    # IDF weights from the bundled training materials and question banks, which stand in for the guide
+    knowledge_base = {}
+    for path in sorted(glob.glob(os.path.join(CAMP_DIR, "training_materials", "*.json")) +
+                       glob.glob(os.path.join(CAMP_DIR, "assessments", "*.json"))):
+        with open(path, "r") as f:
+            texts = iter_strings(json.load(f))
+            knowledge_base[os.path.basename(path)] = [
+                sentence for text in texts for sentence in re.split(r"(?<=[.?!])\s+", text) if sentence
+            ]
+    return FreeTextGrader(HashedVectorIndex.build(knowledge_base))
+
+@pytest.fixture(scope="module")
+def questions():
+    modules = [
+        CompliancePolicyTraining, DataAnalyticsTraining, ProjectManagementTraining,
+        RiskForecastingTraining, SystemsIntegrationTraining, ImplementationSupportTraining
+    ]
+    return {
+        f"{question['assessment']}/{question['id']}": question
+        for module in modules for question in module().get_certification_questions()
+        if not question.get('options')
+    }
+
+def grade(grader, questions, answers):
+    keys = list(answers)
+    return dict(zip(keys, grader.grade_batch(
+        [answers[key] for key in keys],
+        [questions[key]['answer'] for key in keys],
+        [questions[key]['question'] for key in keys]
+    )))
+
+def test_verbose_correct_answers_pass(grader, questions):
+    grades = grade(grader, questions, VERBOSE_ANSWERS)
+    scores = [result['score'] for result in grades.values()]
+    assert sum(scores) / len(scores) >= CERTIFICATION_PASSING_SCORE
+    assert min(scores) >= 0.8, grades
+
+def test_reference_in_prose_earns_full_credit(grader, questions):
+    padded = {
+        key: (
+            "Based on the IPMDAR implementation guide and the retrieved knowledge, the answer is as follows. "
+            f"{question['answer']} Confirm the details against the contract, the CDRL and any program-specific "
+            "guidance from the contracting officer."
+        )
+        for key, question in questions.items()
+    }
+    for key, result in grade(grader, questions, padded).items():
+        assert result['score'] == pytest.approx(1.0), key
+
+def test_off_topic_answers_fail(grader, questions):
+    for key, result in grade(grader, questions, WRONG_ANSWERS).items():
+        assert result['score'] < 0.5, (key, result)
+
+def test_computed_figures_must_match(grader, questions):
+    key = "rf_assessment_1/q2"
+    wrong_figures = VERBOSE_ANSWERS[key].replace("112.5M", "118.0M").replace("140.6M", "151.2M")
+    grades = grade(grader, questions, {key: wrong_figures})
+    assert grades[key]['key_figures'] == 4
+    assert grades[key]['figures_matched'] == 2
+    assert grades[key]['score'] < CERTIFICATION_PASSING_SCORE
+
+def test_bare_figure_graded_on_figure_alone(grader, questions):
+    key = "da_assessment_1/q1"
+    assert grade(grader, questions, {key: "CPI = 500,000 / 550,000 = 0.91, so the program is over budget."})[key]['score'] == 1.0
+    assert grade(grader, questions, {key: "The CPI is 1.10, so the program is under budget."})[key]['score'] == 0.0
@@ -0,0 +1,69 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from agents.provider_clients import ProviderClientRegistry
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    """Answers every POST with a small JSON body over a keep-alive HTTP/1.1 connection."""
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        # One handler instance serves one accepted connection
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = json.dumps({"ok": True}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    server.lock = threading.Lock()
+    server.connections = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server, f"http://127.0.0.1:{server.server_address[1]}/v1/generate"
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def registry():
+    registry = ProviderClientRegistry()
+    yield registry
+    registry.close()
+
+def test_sessions_reuse_pooled_connections(stub_server, registry):
+    server, url = stub_server
+    for _ in range(5):
+        response = registry.post("cohere", url, json={"prompt": "hello"})
+        assert response.json() == {"ok": True}
+    assert server.connections == 1
+
+def test_sessions_are_shared_per_provider(registry):
+    assert registry.session("groq") is registry.session("groq")
+    assert registry.session("groq") is not registry.session("cohere")
+
+def test_async_clients_reuse_pooled_connections(stub_server, registry):
+    server, url = stub_server
+
+    async def post_several():
+        for _ in range(5):
+            response = await registry.async_post("groq", url, json={"prompt": "hello"})
+            assert response.json() == {"ok": True}
+
+    registry.run(post_several())
+    registry.run(post_several())
+    assert server.connections == 1
@@ -0,0 +1,122 @@
+"""
+Assessment Benchmark for IPMDAR AI Expert System
+
+Runs each agent's certification questions twice, once per question and once
+with multiple-choice questions batched into shared prompts, and reports how
+many provider calls and how much wall time batching saves. Batched mode is
+validated against single-question mode by its score and by how often both
+modes chose the same option. An adaptive test, using the item calibration in
+ipmdar_camp/logs, is run as well; its calls are reported along with whether
+it reached the same pass/fail decision as the full single-question run.
+Calls that ended in an error, such as calls refused by the rate limiter,
+are not counted as provider calls; the "failed" column totals them across
+the three runs.
+
+This calls the real LLM providers, so set the API keys first (see .env).
+
+Run from the repository root:
+    python utils/assessment_benchmark.py [--agents compliance,risk_forecasting]
+"""
+
+import os
+import sys
+import argparse
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+from agents.compliance_policy import ComplianceAgent
+from agents.data_analytics import DataAnalyticsAgent
+from agents.project_management import ProjectManagementAgent
+from agents.risk_forecasting import RiskForecastingAgent
+from agents.systems_integration import SystemsIntegrationAgent
+from agents.implementation_support import ImplementationSupportAgent
+from ipmdar_camp.assessment_engine import AssessmentEngine
+from ipmdar_camp.adaptive_testing import AdaptiveAssessment, ItemCalibration
+from ipmdar_camp.training_camp import CERTIFICATION_PASSING_SCORE
+from ipmdar_camp.training_modules import (
+    CompliancePolicyTraining,
+    DataAnalyticsTraining,
+    ProjectManagementTraining,
+    RiskForecastingTraining,
+    SystemsIntegrationTraining,
+    ImplementationSupportTraining
+)
+from utils.pdf_processor import load_knowledge_base
+
+PDF_PATH = "IPMDAR Implementation and Tailoring Guide_Stamped.pdf"
+CALIBRATION_PATH = "ipmdar_camp/logs/item_calibration.json"
+
+# agent id -> (agent class, training module class), as paired by the application
+PANEL = {
+    "compliance": (ComplianceAgent, CompliancePolicyTraining),
+    "data_analytics": (DataAnalyticsAgent, DataAnalyticsTraining),
+    "project_management": (ProjectManagementAgent, ProjectManagementTraining),
+    "risk_forecasting": (RiskForecastingAgent, RiskForecastingTraining),
+    "systems_integration": (SystemsIntegrationAgent, SystemsIntegrationTraining),
+    "implementation_support": (ImplementationSupportAgent, ImplementationSupportTraining)
+}
+
+def agreement(single, batched):
+    """Return the fraction of multiple-choice questions on which both runs chose the same option."""
+    chosen = {(result['assessment'], result['id']): result.get('chosen') for result in single['questions']
+              if result['type'] == 'multiple_choice'}
+    matches = [chosen[(result['assessment'], result['id'])] == result.get('chosen')
+               for result in batched['questions'] if (result['assessment'], result['id']) in chosen]
+    return sum(matches) / len(matches) if matches else 1.0
+
+def main():
+    """Run the single-question, batched and adaptive assessments for each agent and print a comparison table."""
+    parser = argparse.ArgumentParser(description="Compare batched and single-question certification assessments")
+    parser.add_argument("--agents", default=",".join(PANEL), help="comma-separated agent ids to assess")
+    args = parser.parse_args()
+
+    load_dotenv()
+    knowledge_base = load_knowledge_base(PDF_PATH)
+    engine = AssessmentEngine()
+    adaptive = AdaptiveAssessment(engine, ItemCalibration(CALIBRATION_PATH))
+
+    totals = {"single_calls": 0, "batched_calls": 0, "adaptive_calls": 0, "failed_calls": 0,
+              "single_seconds": 0.0, "batched_seconds": 0.0}
+    print(f"\nAssessment benchmark: concurrency {engine.max_concurrency}")
+    print("=" * 126)
+    print(f"{'agent':<24}{'questions':>10}{'calls':>14}{'seconds':>18}{'score':>16}{'agreement':>12}"
+          f"{'adaptive':>12}{'same':>8}{'failed':>8}")
+    for agent_id in filter(None, args.agents.split(",")):
+        agent_class, module_class = PANEL[agent_id]
+        agent = agent_class(knowledge_base)
+        questions = module_class().get_certification_questions()
+
+        single = engine.assess(agent, questions, batched=False)
+        batched = engine.assess(agent, questions, batched=True)
+        adaptive_run = adaptive.assess(agent, questions, CERTIFICATION_PASSING_SCORE)
+        same_decision = ((adaptive_run["score"] >= CERTIFICATION_PASSING_SCORE)
+                         == (single["score"] >= CERTIFICATION_PASSING_SCORE))
+        totals["single_calls"] += single["provider_calls"]
+        totals["batched_calls"] += batched["provider_calls"]
+        totals["adaptive_calls"] += adaptive_run["provider_calls"]
+        failed_calls = single["failed_calls"] + batched["failed_calls"] + adaptive_run["failed_calls"]
+        totals["failed_calls"] += failed_calls
+        totals["single_seconds"] += single["elapsed_seconds"]
+        totals["batched_seconds"] += batched["elapsed_seconds"]
+
+        print(f"{agent_id:<24}{len(questions):>10}"
+              f"{single['provider_calls']:>7} ->{batched['provider_calls']:>4}"
+              f"{single['elapsed_seconds']:>9.1f} ->{batched['elapsed_seconds']:>6.1f}"
+              f"{single['score']:>8.2f} ->{batched['score']:>5.2f}"
+              f"{agreement(single, batched):>12.2f}"
+              f"{adaptive_run['provider_calls']:>12}{'yes' if same_decision else 'no':>8}{failed_calls:>8}")
+    print("=" * 126)
+    if totals["single_calls"]:
+        print(f"provider calls: {totals['single_calls']} -> {totals['batched_calls']} batched "
+              f"({1 - totals['batched_calls'] / totals['single_calls']:.0%} fewer), "
+              f"{totals['adaptive_calls']} adaptive ({1 - totals['adaptive_calls'] / totals['single_calls']:.0%} fewer)")
+        if totals["failed_calls"]:
+            print(f"failed or refused calls, not counted above: {totals['failed_calls']}; "
+                  f"scores leave out the questions they affected")
+        print(f"wall time: {totals['single_seconds']:.1f}s -> {totals['batched_seconds']:.1f}s "
+              f"({1 - totals['batched_seconds'] / max(totals['single_seconds'], 1e-9):.0%} less)\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Sentence Classifier Benchmark for IPMDAR AI Expert System
+
+Times the compiled keyword classifier used by create_knowledge_base against
+the original nested keyword loop on the bundled IPMDAR Implementation and
+Tailoring Guide, and checks that both produce identical categories.
+
+Run from the repository root:
+    python utils/classifier_benchmark.py [--rounds 20]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.pdf_processor import (
+    CATEGORY_KEYWORDS,
+    KNOWLEDGE_CATEGORIES,
+    classify_sentences,
+    extract_pdf_text,
+    sent_tokenize
+)
+
+PDF_PATH = "IPMDAR Implementation and Tailoring Guide_Stamped.pdf"
+
+def classify_sentences_reference(sentences):
+    """Original classifier: substring search for every keyword of every category."""
+    knowledge_base = {category: [] for category in KNOWLEDGE_CATEGORIES}
+    knowledge_base["general"] = []
+    for sentence in sentences:
+        sentence_lower = sentence.lower()
+        categorized = False
+        for category in KNOWLEDGE_CATEGORIES:
+            for keyword in CATEGORY_KEYWORDS[category]:
+                if keyword.lower() in sentence_lower:
+                    knowledge_base[category].append(sentence.strip())
+                    categorized = True
+                    break
+            if categorized:
+                break
+        if not categorized:
+            knowledge_base["general"].append(sentence.strip())
+    return knowledge_base
+
+def best_time(classify, sentences, rounds):
+    """Return the fastest of several timed runs, in milliseconds."""
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        classify(sentences)
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+def main():
+    """Run the classifier benchmark and print the speedup."""
+    parser = argparse.ArgumentParser(description="Benchmark the knowledge base sentence classifier")
+    parser.add_argument("--rounds", type=int, default=20, help="timed runs per classifier")
+    args = parser.parse_args()
+
+    sentences = sent_tokenize(extract_pdf_text(PDF_PATH))
+    if not sentences:
+        print("No sentences extracted; nothing to benchmark.")
+        return
+
+    identical = classify_sentences(sentences) == classify_sentences_reference(sentences)
+    reference_ms = best_time(classify_sentences_reference, sentences, args.rounds)
+    compiled_ms = best_time(classify_sentences, sentences, args.rounds)
+
+    print(f"\nClassifier benchmark: {len(sentences)} sentences, best of {args.rounds} runs")
+    print("=" * 60)
+    print(f"{'nested keyword loop':<28}{reference_ms:>12.2f} ms")
+    print(f"{'compiled keyword patterns':<28}{compiled_ms:>12.2f} ms")
+    print(f"{'speedup':<28}{reference_ms / compiled_ms:>12.2f} x")
+    print(f"{'identical output':<28}{str(identical):>12}")
+    print("=" * 60 + "\n")
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,102 @@
-import PyPDF2
-import nltk
 import os
+import re
 import json
-from nltk.tokenize import sent_tokenize
+import gzip
+import hashlib
+from utils.retrieval import BM25Index, HashedVectorIndex, KeywordPostings, VECTOR_INDEX_VERSION
 
-# Download NLTK resources if not already downloaded
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
+# nltk and PyPDF2 are imported on first use: a knowledge base served from the cache needs neither
+
+# Bump when the layout of the cached knowledge base changes
+KNOWLEDGE_BASE_CACHE_VERSION = 1
+
+# Directory holding cached knowledge bases (shared by all workers on a host)
+KNOWLEDGE_BASE_CACHE_DIR = os.getenv("IPMDAR_KB_CACHE_DIR", "cache")
+
+# Categories in classification order; the first category with a matching keyword wins
+KNOWLEDGE_CATEGORIES = [
+    "compliance_policy",
+    "data_analytics",
+    "project_management",
+    "risk_forecasting",
+    "systems_integration",
+    "implementation"
+]
+
+# Keywords for each category to help with classification
+CATEGORY_KEYWORDS = {
+    "compliance_policy": [
+        "compliance", "policy", "regulation", "guideline", "requirement", "standard",
+        "acquisition", "federal", "law", "statute", "mandate", "rule", "directive",
+        "DFARS", "FAR", "CFR", "DCMA", "regulatory", "approval", "authorize"
+    ],
+    "data_analytics": [
+        "analytics", "metrics", "measurement", "data", "report", "dashboard",
+        "analysis", "trend", "statistic", "calculation", "EVM", "earned value",
+        "performance", "indicator", "SPI", "CPI", "variance"
+    ],
+    "project_management": [
+        "management", "project", "planning", "execution", "CDRL", "deliverable",
+        "milestone", "schedule", "timeline", "work breakdown", "WBS", "tailoring",
+        "implementation", "contract", "SOW", "statement of work"
+    ],
+    "risk_forecasting": [
+        "risk", "forecast", "prediction", "mitigation", "probability", "impact",
+        "likelihood", "consequence", "uncertainty", "opportunity", "threat",
+        "contingency", "reserve", "estimate", "projection", "future"
+    ],
+    "systems_integration": [
+        "integration", "system", "technical", "interface", "interoperability",
+        "architecture", "compatibility", "data format", "JSON", "schema", "XML",
+        "standard", "protocol", "automation", "tool", "software"
+    ],
+    "implementation": [
+        "implementation", "step", "procedure", "instruction", "guide", "manual",
+        "how-to", "process", "workflow", "operation", "conduct", "perform",
+        "execute", "action", "activity", "task"
+    ]
+}
+
+def keyword_pattern(keywords):
+    """
+    Compile keywords into one regex whose alternatives are factored into a prefix trie.
+
+    Sharing prefixes (e.g. "regulat(?:ion|ory)") lets a single search test every
+    keyword at a position without backtracking through each alternative in turn.
+    """
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword.lower():
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{pattern})?" if "" in node else pattern
+
+    return re.compile(build(trie))
+
+# Compiled matchers: one per category plus a combined one that detects uncategorized sentences
+CATEGORY_PATTERNS = [(category, keyword_pattern(CATEGORY_KEYWORDS[category])) for category in KNOWLEDGE_CATEGORIES]
+ANY_KEYWORD_PATTERN = keyword_pattern({keyword for keywords in CATEGORY_KEYWORDS.values() for keyword in keywords})
+
+def sent_tokenize(text):
+    """Split text into sentences with NLTK's punkt tokenizer, fetching its model on first use."""
+    import nltk
+    try:
+        nltk.data.find('tokenizers/punkt')
+    except LookupError:
+        # Hosts without internet access should pre-install punkt under NLTK_DATA
+        nltk.download('punkt')
+    return nltk.tokenize.sent_tokenize(text)
 
 def extract_pdf_text(pdf_path):
     """Extract text from PDF file."""
+    import PyPDF2
     text = ""
     try:
         with open(pdf_path, 'rb') as file:
@@ -28,72 +113,132 @@ def create_knowledge_base(text):
     """Create a structured knowledge base from the extracted text."""
     # Split text into sentences
     sentences = sent_tokenize(text)
-    
+
+    return _finalize_knowledge_base(classify_sentences(sentences))
+
+def classify_sentences(sentences):
+    """Sort sentences into knowledge base categories using the keyword table."""
     # Create initial knowledge structure
-    knowledge_base = {
-        "compliance_policy": [],
-        "data_analytics": [],
-        "project_management": [],
-        "risk_forecasting": [],
-        "systems_integration": [],
-        "implementation": [],
-        "general": []
-    }
-    
-    # Keywords for each category to help with classification
-    keywords = {
-        "compliance_policy": [
-            "compliance", "policy", "regulation", "guideline", "requirement", "standard", 
-            "acquisition", "federal", "law", "statute", "mandate", "rule", "directive",
-            "DFARS", "FAR", "CFR", "DCMA", "regulatory", "approval", "authorize"
-        ],
-        "data_analytics": [
-            "analytics", "metrics", "measurement", "data", "report", "dashboard", 
-            "analysis", "trend", "statistic", "calculation", "EVM", "earned value", 
-            "performance", "indicator", "SPI", "CPI", "variance"
-        ],
-        "project_management": [
-            "management", "project", "planning", "execution", "CDRL", "deliverable", 
-            "milestone", "schedule", "timeline", "work breakdown", "WBS", "tailoring",
-            "implementation", "contract", "SOW", "statement of work"
-        ],
-        "risk_forecasting": [
-            "risk", "forecast", "prediction", "mitigation", "probability", "impact",
-            "likelihood", "consequence", "uncertainty", "opportunity", "threat",
-            "contingency", "reserve", "estimate", "projection", "future"
-        ],
-        "systems_integration": [
-            "integration", "system", "technical", "interface", "interoperability",
-            "architecture", "compatibility", "data format", "JSON", "schema", "XML",
-            "standard", "protocol", "automation", "tool", "software"
-        ],
-        "implementation": [
-            "implementation", "step", "procedure", "instruction", "guide", "manual",
-            "how-to", "process", "workflow", "operation", "conduct", "perform",
-            "execute", "action", "activity", "task"
-        ]
-    }
-    
-    # Classify sentences into categories based on keywords
+    knowledge_base = {category: [] for category in KNOWLEDGE_CATEGORIES}
+    knowledge_base["general"] = []
+
+    # Classify sentences into the first category with a matching keyword
     for sentence in sentences:
         sentence_lower = sentence.lower()
-        categorized = False
-        
-        for category, category_keywords in keywords.items():
-            for keyword in category_keywords:
-                if keyword.lower() in sentence_lower:
-                    knowledge_base[category].append(sentence.strip())
-                    categorized = True
+        target = "general"
+        if ANY_KEYWORD_PATTERN.search(sentence_lower):
+            for category, pattern in CATEGORY_PATTERNS:
+                if pattern.search(sentence_lower):
+                    target = category
                     break
-            if categorized:
-                break
-        
-        # If not categorized, add to general
-        if not categorized:
-            knowledge_base["general"].append(sentence.strip())
-    
-    # Create embedding index for faster retrieval (placeholder for actual embedding implementation)
-    # In a production system, you would use embeddings from models like OpenAI's or other embedding services
-    knowledge_base["_index"] = "Placeholder for embeddings index"
-    
+        knowledge_base[target].append(sentence.strip())
+
     return knowledge_base
+
+def _finalize_knowledge_base(knowledge_base, vector_path=None):
+    """
+    Attach derived retrieval indexes to a knowledge base of categorized sentences.
+
+    When vector_path is given the embedding matrix is memory-mapped from that
+    file (building it on first use) so worker processes share one copy.
+    """
+    # Content fingerprint so anything derived from the knowledge base (e.g. cached answers) can be invalidated
+    knowledge_base["_version"] = hashlib.sha256(json.dumps(knowledge_base).encode("utf-8")).hexdigest()[:16]
+
+    # Build the BM25 inverted index used for query-aware retrieval
+    knowledge_base["_bm25"] = BM25Index(knowledge_base)
+
+    # Keyword postings that agents use to pull related sentences from other categories
+    knowledge_base["_keywords"] = KeywordPostings(knowledge_base)
+
+    # Create the hashed TF-IDF embedding index used by the "vector" retrieval backend
+    if vector_path:
+        knowledge_base["_index"] = HashedVectorIndex.load_or_build(knowledge_base, vector_path)
+    else:
+        knowledge_base["_index"] = HashedVectorIndex.build(knowledge_base)
+
+    return knowledge_base
+
+def keyword_table_version():
+    """Return a short fingerprint of the classification keyword table."""
+    table = json.dumps([[category, CATEGORY_KEYWORDS[category]] for category in KNOWLEDGE_CATEGORIES])
+    return hashlib.sha256(table.encode("utf-8")).hexdigest()[:16]
+
+def file_sha256(path):
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def load_knowledge_base(pdf_path, cache_dir=KNOWLEDGE_BASE_CACHE_DIR):
+    """
+    Load the knowledge base for a PDF, reusing the on-disk cache when it is valid.
+
+    The cache is keyed by the PDF's content hash and the keyword table version,
+    so it is rebuilt automatically whenever either of them changes.
+    """
+    try:
+        pdf_hash = file_sha256(pdf_path)
+    except OSError as e:
+        print(f"Error hashing PDF for knowledge base cache: {e}")
+        return create_knowledge_base(extract_pdf_text(pdf_path))
+
+    keywords_version = keyword_table_version()
+    cache_key = f"{pdf_hash[:16]}-{keywords_version}"
+    cache_path = os.path.join(cache_dir, f"kb-{cache_key}.json.gz")
+    vector_path = os.path.join(cache_dir, f"vectors-{cache_key}-v{VECTOR_INDEX_VERSION}.npy")
+
+    categories = _read_knowledge_base_cache(cache_path, pdf_hash, keywords_version)
+    if categories is not None:
+        return _finalize_knowledge_base(categories, vector_path)
+
+    text = extract_pdf_text(pdf_path)
+    if not text:
+        return create_knowledge_base(text)
+
+    categories = classify_sentences(sent_tokenize(text))
+    _write_knowledge_base_cache(cache_path, pdf_hash, keywords_version, categories)
+    return _finalize_knowledge_base(categories, vector_path)
+
+def _read_knowledge_base_cache(cache_path, pdf_hash, keywords_version):
+    """Return the cached categorized sentences, or None if the cache is missing or stale."""
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        with gzip.open(cache_path, 'rt', encoding='utf-8') as f:
+            payload = json.load(f)
+    except Exception as e:
+        print(f"Ignoring unreadable knowledge base cache {cache_path}: {e}")
+        return None
+
+    if (payload.get("cache_version") != KNOWLEDGE_BASE_CACHE_VERSION
+            or payload.get("pdf_sha256") != pdf_hash
+            or payload.get("keywords_version") != keywords_version):
+        return None
+    return payload["categories"]
+
+def _write_knowledge_base_cache(cache_path, pdf_hash, keywords_version, categories):
+    """Atomically write the categorized sentences and drop cache files for older inputs."""
+    cache_dir = os.path.dirname(cache_path) or "."
+    payload = {
+        "cache_version": KNOWLEDGE_BASE_CACHE_VERSION,
+        "pdf_sha256": pdf_hash,
+        "keywords_version": keywords_version,
+        "categories": categories
+    }
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write to a per-process temp file first so concurrent workers never read a partial cache
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(payload, f, separators=(",", ":"))
+        os.replace(tmp_path, cache_path)
+
+        cache_key = f"{pdf_hash[:16]}-{keywords_version}"
+        for name in os.listdir(cache_dir):
+            if name.startswith(("kb-", "vectors-")) and cache_key not in name:
+                os.remove(os.path.join(cache_dir, name))
+    except OSError as e:
+        print(f"Error writing knowledge base cache {cache_path}: {e}")
@@ -0,0 +1,310 @@
+import os
+import re
+import math
+import zlib
+import heapq
+from collections import Counter, defaultdict
+import numpy as np
+
+# Common English words that carry no retrieval signal
+STOPWORDS = frozenset([
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "does", "for",
+    "from", "how", "i", "in", "is", "it", "its", "me", "my", "of", "on", "or",
+    "shall", "should", "that", "the", "their", "this", "to", "was", "what",
+    "when", "where", "which", "who", "why", "will", "with", "would", "you", "your"
+])
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Width of the hashed TF-IDF vectors; bump VECTOR_INDEX_VERSION when changing the vectorizer
+VECTOR_DIMENSIONS = 2048
+VECTOR_INDEX_VERSION = 1
+
+def tokenize(text):
+    """Lowercase a text and split it into retrieval terms."""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+def iter_documents(knowledge_base):
+    """Yield (category, sentence) pairs in the order used for document ids."""
+    for category, sentences in knowledge_base.items():
+        if category.startswith("_"):
+            continue
+        for sentence in sentences:
+            yield category, sentence
+
+class BM25Index:
+    """
+    Inverted index over knowledge base sentences ranked with Okapi BM25.
+
+    Each document is one sentence tagged with the knowledge base category it
+    was classified into, so searches can be restricted to an agent's categories.
+    """
+
+    def __init__(self, knowledge_base, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.sentences = []
+        self.categories = []
+        self.doc_lengths = []
+        self.postings = defaultdict(list)
+
+        for category, sentence in iter_documents(knowledge_base):
+            doc_id = len(self.sentences)
+            terms = Counter(tokenize(sentence))
+            self.sentences.append(sentence)
+            self.categories.append(category)
+            self.doc_lengths.append(sum(terms.values()))
+            for term, frequency in terms.items():
+                self.postings[term].append((doc_id, frequency))
+
+        doc_count = len(self.sentences)
+        self.average_length = (sum(self.doc_lengths) / doc_count) if doc_count else 0.0
+        self.idf = {
+            term: math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self.postings.items()
+        }
+
+    def __len__(self):
+        return len(self.sentences)
+
+    def search(self, query, top_k=20, categories=None):
+        """
+        Rank sentences against a query.
+
+        Args:
+            query: Free-text query
+            top_k: Maximum number of results to return
+            categories: Optional iterable of categories to restrict results to
+
+        Returns:
+            list: (doc_id, score) pairs, best match first
+        """
+        allowed = set(categories) if categories is not None else None
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for doc_id, frequency in self.postings[term]:
+                if allowed is not None and self.categories[doc_id] not in allowed:
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / self.average_length)
+                scores[doc_id] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+        return heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+
+    def top_sentences(self, query, top_k=20, categories=None):
+        """Return the text of the best matching sentences for a query."""
+        return [self.sentences[doc_id] for doc_id, _ in self.search(query, top_k, categories)]
+
+def _hashed_features(text, dimensions):
+    """
+    Return {bucket: signed sublinear term frequency} for the words and bigrams of a text.
+
+    Bare numbers (page and section references) only contribute through bigrams,
+    and each feature's sign comes from its hash so colliding features tend to
+    cancel rather than reinforce each other.
+    """
+    tokens = tokenize(text)
+    features = Counter(token for token in tokens if not token.isdigit())
+    features.update(f"{first} {second}" for first, second in zip(tokens, tokens[1:]))
+    buckets = {}
+    for feature, count in features.items():
+        feature_hash = zlib.crc32(feature.encode("utf-8"))
+        sign = 1.0 if feature_hash & 0x80000000 else -1.0
+        bucket = feature_hash % dimensions
+        buckets[bucket] = buckets.get(bucket, 0.0) + sign * (1.0 + math.log(count))
+    return buckets
+
+def _hashed_terms(text, dimensions):
+    """
+    Return the buckets of a text's distinct terms: its words, plus the bigrams that contain a number.
+
+    Unlike _hashed_features this ignores order and repetition, and keeps
+    identifiers such as "Instruction 5000.02" without rewarding matching word pairs.
+    """
+    tokens = tokenize(text)
+    terms = {token for token in tokens if not token.isdigit()}
+    terms.update(f"{first} {second}" for first, second in zip(tokens, tokens[1:]) if first.isdigit() or second.isdigit())
+    return {zlib.crc32(term.encode("utf-8")) % dimensions for term in terms}
+
+class HashedVectorIndex:
+    """
+    Dense retrieval index of hashed TF-IDF sentence vectors.
+
+    Rows are L2-normalized, so cosine similarity for a batch of queries is a
+    single matrix product. The matrix is saved as a .npy file and opened with
+    mmap_mode so every worker process shares the same page-cache copy.
+    """
+
+    def __init__(self, matrix, idf, sentences, categories):
+        self.matrix = matrix
+        self.idf = idf
+        self.sentences = sentences
+        self.categories = categories
+        self.dimensions = matrix.shape[1]
+        self._category_ids = {}
+        self._doc_categories = np.array(
+            [self._category_ids.setdefault(category, len(self._category_ids)) for category in categories],
+            dtype=np.int32
+        )
+
+    @classmethod
+    def build(cls, knowledge_base, dimensions=VECTOR_DIMENSIONS):
+        """Vectorize every sentence in a knowledge base."""
+        documents = list(iter_documents(knowledge_base))
+        matrix = np.zeros((len(documents), dimensions), dtype=np.float32)
+        for row, (_, sentence) in enumerate(documents):
+            for bucket, weight in _hashed_features(sentence, dimensions).items():
+                matrix[row, bucket] = weight
+
+        document_frequency = np.count_nonzero(matrix, axis=0)
+        idf = (np.log((1 + len(documents)) / (1 + document_frequency)) + 1).astype(np.float32)
+        matrix *= idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix /= np.where(norms == 0, 1, norms)
+
+        return cls(matrix, idf, [sentence for _, sentence in documents], [category for category, _ in documents])
+
+    @classmethod
+    def load_or_build(cls, knowledge_base, path, dimensions=VECTOR_DIMENSIONS):
+        """
+        Memory-map the index stored at path, building and saving it first if needed.
+
+        Args:
+            knowledge_base: Knowledge base the index must describe
+            path: Location of the .npy matrix; the IDF weights are stored next to it
+            dimensions: Width of the hashed vectors
+
+        Returns:
+            HashedVectorIndex: Index backed by a read-only memory map when possible
+        """
+        idf_path = path.replace(".npy", ".idf.npy")
+        documents = list(iter_documents(knowledge_base))
+        sentences = [sentence for _, sentence in documents]
+        categories = [category for category, _ in documents]
+        try:
+            matrix = np.load(path, mmap_mode="r")
+            idf = np.load(idf_path)
+            if matrix.shape == (len(documents), dimensions):
+                return cls(matrix, idf, sentences, categories)
+        except (OSError, ValueError):
+            pass
+
+        index = cls.build(knowledge_base, dimensions)
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            for target, array in ((idf_path, index.idf), (path, index.matrix)):
+                tmp_path = f"{target}.{os.getpid()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    np.save(f, array)
+                os.replace(tmp_path, target)
+            return cls(np.load(path, mmap_mode="r"), index.idf, sentences, categories)
+        except OSError as e:
+            print(f"Error saving vector index {path}: {e}")
+            return index
+
+    def __len__(self):
+        return len(self.sentences)
+
+    def embed(self, texts):
+        """Return the normalized query vectors for a list of texts."""
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for bucket, weight in _hashed_features(text, self.dimensions).items():
+                vectors[row, bucket] = weight
+        vectors *= self.idf
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+    def term_weights(self, texts):
+        """Return a (len(texts), dimensions) matrix of the IDF weight of each term a text contains, 0 elsewhere."""
+        weights = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            buckets = list(_hashed_terms(text, self.dimensions))
+            weights[row, buckets] = self.idf[buckets]
+        return weights
+
+    def search_batch(self, queries, top_k=20, categories=None):
+        """
+        Rank sentences against several queries with one matrix product.
+
+        Args:
+            queries: List of free-text queries
+            top_k: Maximum number of results per query
+            categories: Optional iterable of categories to restrict results to
+
+        Returns:
+            list: One list of (doc_id, score) pairs per query, best match first
+        """
+        scores = self.embed(queries) @ self.matrix.T
+        if categories is not None:
+            allowed = [self._category_ids[category] for category in categories if category in self._category_ids]
+            scores[:, ~np.isin(self._doc_categories, allowed)] = 0.0
+
+        k = min(top_k, scores.shape[1])
+        results = []
+        for row in scores:
+            if k == 0:
+                results.append([])
+                continue
+            candidates = np.argpartition(-row, k - 1)[:k]
+            candidates = candidates[np.argsort(-row[candidates])]
+            results.append([(int(doc_id), float(row[doc_id])) for doc_id in candidates if row[doc_id] > 0])
+        return results
+
+    def search(self, query, top_k=20, categories=None):
+        """Rank sentences against a single query; see search_batch."""
+        return self.search_batch([query], top_k, categories)[0]
+
+    def top_sentences(self, query, top_k=20, categories=None):
+        """Return the text of the best matching sentences for a query."""
+        return [self.sentences[doc_id] for doc_id, _ in self.search(query, top_k, categories)]
+
+class KeywordPostings:
+    """
+    Keyword -> sentence id postings over the knowledge base.
+
+    Keywords are registered once (agents do this at construction time) and
+    matched case-insensitively as substrings, so per-query lookups are set
+    unions instead of rescanning every sentence.
+    """
+
+    def __init__(self, knowledge_base):
+        self.sentences = []
+        self.category_ranges = {}
+        self.postings = {}
+        self._lowered = []
+
+        for category, sentence in iter_documents(knowledge_base):
+            start, _ = self.category_ranges.get(category, (len(self.sentences), None))
+            self.sentences.append(sentence)
+            self._lowered.append(sentence.lower())
+            self.category_ranges[category] = (start, len(self.sentences))
+
+    def add_keywords(self, keywords):
+        """Build postings for any keywords not seen before."""
+        for keyword in keywords:
+            keyword = keyword.lower()
+            if keyword not in self.postings:
+                self.postings[keyword] = frozenset(
+                    doc_id for doc_id, sentence in enumerate(self._lowered) if keyword in sentence
+                )
+
+    def lookup(self, keywords, categories):
+        """
+        Return sentences from the given categories that contain any of the keywords.
+
+        Args:
+            keywords: Keywords to match; unregistered keywords are indexed on first use
+            categories: Categories to draw sentences from
+
+        Returns:
+            list: Matching sentences in knowledge base order
+        """
+        self.add_keywords(keywords)
+        matches = frozenset().union(*(self.postings[keyword.lower()] for keyword in keywords))
+        ranges = [self.category_ranges[category] for category in categories if category in self.category_ranges]
+        return [
+            self.sentences[doc_id] for doc_id in sorted(matches)
+            if any(start <= doc_id < end for start, end in ranges)
+        ]
@@ -0,0 +1,120 @@
+"""
+Retrieval Benchmark for IPMDAR AI Expert System
+
+Compares the knowledge retrieval strategies available to the agents on the
+bundled IPMDAR Implementation and Tailoring Guide:
+- category dump (the original behaviour: whole category + first 50 general sentences)
+- BM25 inverted index
+- hashed TF-IDF vector index
+
+Queries are generated from sampled guide sentences by keeping a few of their
+content words; a query counts as recalled when its source sentence is in the
+retrieved context. Context size and per-query latency are reported as well.
+
+Run from the repository root:
+    python utils/retrieval_benchmark.py [--queries 200] [--top-k 20]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.pdf_processor import load_knowledge_base
+from utils.retrieval import tokenize
+
+PDF_PATH = "IPMDAR Implementation and Tailoring Guide_Stamped.pdf"
+
+def category_dump(knowledge_base, query, top_k, categories):
+    """Original retrieval: the agent's whole category plus the first 50 general sentences."""
+    sections = []
+    if categories[0] in knowledge_base:
+        sections.extend(knowledge_base[categories[0]])
+    sections.extend(knowledge_base["general"][:50])
+    return sections
+
+def sample_queries(knowledge_base, count, seed=7):
+    """Build (query, source sentence, category) triples from sentences in the guide."""
+    rng = random.Random(seed)
+    candidates = []
+    for category, sentences in knowledge_base.items():
+        if category.startswith("_"):
+            continue
+        for sentence in sentences:
+            terms = tokenize(sentence)
+            if len(terms) >= 8:
+                candidates.append((terms, sentence, category))
+
+    queries = []
+    for terms, sentence, category in rng.sample(candidates, min(count, len(candidates))):
+        positions = sorted(rng.sample(range(len(terms)), 4))
+        query = " ".join(terms[position] for position in positions)
+        # General sentences are reachable from every agent; attribute them to the first category
+        agent_category = category if category != "general" else "compliance_policy"
+        queries.append((query, sentence, agent_category))
+    return queries
+
+def run_strategy(retrieve, queries, top_k):
+    """Return recall, mean context size and latency percentiles for a retrieval function."""
+    hits = 0
+    context_sentences = 0
+    context_chars = 0
+    latencies = []
+    for query, source, category in queries:
+        start = time.perf_counter()
+        context = retrieve(query, top_k, [category, "general"])
+        latencies.append(time.perf_counter() - start)
+        hits += source in context
+        context_sentences += len(context)
+        context_chars += sum(len(sentence) for sentence in context)
+
+    latencies.sort()
+    return {
+        "recall": hits / len(queries),
+        "sentences": context_sentences / len(queries),
+        "chars": context_chars / len(queries),
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95)] * 1000
+    }
+
+def main():
+    """Run the retrieval benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description="Benchmark IPMDAR knowledge retrieval strategies")
+    parser.add_argument("--queries", type=int, default=200, help="number of generated queries")
+    parser.add_argument("--top-k", type=int, default=20, help="sentences retrieved per query")
+    args = parser.parse_args()
+
+    knowledge_base = load_knowledge_base(PDF_PATH)
+    queries = sample_queries(knowledge_base, args.queries)
+    if not queries:
+        print("Knowledge base is empty; nothing to benchmark.")
+        return
+
+    strategies = {
+        "category dump": lambda query, top_k, categories: category_dump(knowledge_base, query, top_k, categories),
+        "bm25": knowledge_base["_bm25"].top_sentences,
+        "vector": knowledge_base["_index"].top_sentences
+    }
+
+    # Batched vector search answers every query with a single matrix product
+    vector_index = knowledge_base["_index"]
+    start = time.perf_counter()
+    vector_index.search_batch([query for query, _, _ in queries], args.top_k)
+    batch_ms = (time.perf_counter() - start) * 1000
+
+    print(f"\nRetrieval benchmark: {len(queries)} queries, top-k {args.top_k}")
+    print("=" * 78)
+    print(f"{'strategy':<16}{'recall':>10}{'sentences':>12}{'chars':>12}{'p50 ms':>12}{'p95 ms':>12}")
+    for name, retrieve in strategies.items():
+        result = run_strategy(retrieve, queries, args.top_k)
+        print(f"{name:<16}{result['recall']:>10.3f}{result['sentences']:>12.1f}{result['chars']:>12.0f}"
+              f"{result['p50_ms']:>12.3f}{result['p95_ms']:>12.3f}")
+    print("=" * 78)
+    print(f"vector batch search for all queries: {batch_ms:.2f} ms total\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+import time
+
+class StartupReport:
+    """
+    Breakdown of application startup time.
+
+    Call mark(phase) as each phase of startup completes; the time since the
+    previous mark is attributed to that phase.
+    """
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self._last_mark = self.started_at
+        self.phases = []
+
+    def mark(self, phase):
+        """Record that a startup phase has just finished."""
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last_mark))
+        self._last_mark = now
+
+    @property
+    def total_seconds(self):
+        return self._last_mark - self.started_at
+
+    def as_dict(self):
+        """Return the phase timings and total, in seconds."""
+        return {
+            "phases": {phase: round(seconds, 4) for phase, seconds in self.phases},
+            "total_seconds": round(self.total_seconds, 4)
+        }
+
+    def print_report(self):
+        """Print the breakdown to stdout."""
+        print("Startup time breakdown:")
+        for phase, seconds in self.phases:
+            print(f"- {phase}: {seconds * 1000:.0f} ms")
+        print(f"- total: {self.total_seconds * 1000:.0f} ms")